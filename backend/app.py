@@ -1,7 +1,8 @@
 import os
 from flask import Flask, jsonify
+from sqlalchemy.orm import configure_mappers
 from dotenv import load_dotenv
-from extensions import db, jwt, migrate, cors
+from extensions import db, jwt, migrate, cors, cache, lemonsqueezy
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +18,29 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # Response cache for public catalog/store endpoints (memory, redis or none)
+    app.config["CACHE_BACKEND"] = os.getenv("CACHE_BACKEND", "memory")
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL")
+    app.config["CACHE_DEFAULT_TTL"] = int(os.getenv("CACHE_DEFAULT_TTL", "60"))
+    app.config["CACHE_MAX_ENTRIES"] = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+    # Lemon Squeezy API client: pooled connections, bounded timeouts and retries
+    app.config["LEMONSQUEEZY_API_URL"] = os.getenv("LEMONSQUEEZY_API_URL", "https://api.lemonsqueezy.com/v1")
+    app.config["LEMONSQUEEZY_API_KEY"] = os.getenv("LEMONSQUEEZY_API_KEY")
+    app.config["LEMONSQUEEZY_CONNECT_TIMEOUT"] = float(os.getenv("LEMONSQUEEZY_CONNECT_TIMEOUT", "3.05"))
+    app.config["LEMONSQUEEZY_READ_TIMEOUT"] = float(os.getenv("LEMONSQUEEZY_READ_TIMEOUT", "10"))
+    app.config["LEMONSQUEEZY_MAX_RETRIES"] = int(os.getenv("LEMONSQUEEZY_MAX_RETRIES", "2"))
+    app.config["LEMONSQUEEZY_POOL_SIZE"] = int(os.getenv("LEMONSQUEEZY_POOL_SIZE", "10"))
+
+    # Async checkout: create the provider checkout in the background and let the client poll
+    app.config["CHECKOUT_ASYNC"] = os.getenv("CHECKOUT_ASYNC", "false").lower() in ("1", "true", "yes")
+    # Threads for in-process background work (checkout intents, webhook events)
+    app.config["BACKGROUND_WORKERS"] = int(os.getenv("BACKGROUND_WORKERS", "4"))
+    # Unpaid orders older than this are cancelled by `flask orders reap`
+    app.config["UNPAID_ORDER_MAX_AGE_HOURS"] = float(os.getenv("UNPAID_ORDER_MAX_AGE_HOURS", "24"))
+    # How long a checkout response is replayed for repeats with the same Idempotency-Key
+    app.config["IDEMPOTENCY_KEY_TTL_HOURS"] = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
     # Determine CORS origins based on environment
     flask_env = os.getenv("FLASK_ENV", "production")
     if flask_env == "development":
@@ -31,17 +55,24 @@ def create_app():
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    cache.init_app(app)
+    lemonsqueezy.init_app(app)
     cors.init_app(app, resources={
         r"/api/*": {
             "origins": allowed_origins,
             "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+            "expose_headers": ["Retry-After", "Idempotent-Replayed"],
             "supports_credentials": False
         }
     })
 
     with app.app_context():
         import models
+        # Resolve backrefs (e.g. Product.user) so loader options can reference them
+        configure_mappers()
+        from principal import register_jwt_callbacks
+        register_jwt_callbacks(jwt)
         from routes import api_bp
         from routes.store import store_bp
 
@@ -53,4 +84,7 @@ def create_app():
         app.register_blueprint(api_bp, url_prefix='/api')
         app.register_blueprint(store_bp, url_prefix='/api/stores')
 
+        from commands import register_commands
+        register_commands(app)
+
         return app
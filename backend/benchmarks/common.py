@@ -0,0 +1,24 @@
+import os
+
+# Benchmarks never run against the application database from .env
+DEFAULT_DATABASE_URL = 'sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark.db')
+
+
+def create_benchmark_app(cache_backend='none'):
+    """Create the Flask app bound to BENCHMARK_DATABASE_URL (a local SQLite file by default)"""
+    os.environ['DATABASE_URL'] = os.environ.get('BENCHMARK_DATABASE_URL', DEFAULT_DATABASE_URL)
+    os.environ['CACHE_BACKEND'] = cache_backend
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-jwt-secret-key-with-enough-length')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ['FLASK_ENV'] = 'development'  # enables /api/checkout/test
+
+    # Presigning download URLs is a local computation, so dummy MinIO settings
+    # let the download endpoint run end to end without a storage server.
+    os.environ.setdefault('MINIO_ENDPOINT', 'http://localhost:9000')
+    os.environ.setdefault('MINIO_ACCESS_KEY', 'benchmark')
+    os.environ.setdefault('MINIO_SECRET_KEY', 'benchmark')
+    os.environ.setdefault('MINIO_PUBLIC_BUCKET', 'benchmark-public')
+    os.environ.setdefault('MINIO_PRIVATE_BUCKET', 'benchmark-private')
+
+    from app import create_app
+    return create_app()
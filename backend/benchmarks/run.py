@@ -0,0 +1,219 @@
+"""Benchmark the hot API endpoints against a seeded database.
+
+Usage (from backend/, after `python -m benchmarks.seed`):
+
+    python -m benchmarks.run                              # print results
+    python -m benchmarks.run --save-baseline              # record benchmarks/baseline.json
+    python -m benchmarks.run --compare                    # fail on regressions vs the baseline
+
+Requests go through create_app() and the Flask test client, so the numbers
+cover routing, SQL and serialization but not the network or gunicorn.
+For every scenario the runner reports p50/p99 latency and the number of SQL
+statements per request. The response cache is off unless --with-cache is
+given, so the database path is what gets measured.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, func
+
+from benchmarks.common import create_benchmark_app
+from benchmarks.seed import HEAVY_BUYER, CART_BUYER, CHECKOUT_BUYER
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+class Scenario:
+    """One benchmarked request. `setup` runs before every timed call and is not measured."""
+
+    def __init__(self, name, method, path, user=None, body=None, setup=None, expect=200):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.user = user
+        self.body = body
+        self.setup = setup
+        self.expect = expect
+
+
+def build_scenarios(db):
+    from models import Product, ProductFile, Store, User, Order, Cart, CartItem, Entitlement
+
+    heavy_buyer = User.query.filter_by(username=HEAVY_BUYER).one()
+    checkout_buyer = User.query.filter_by(username=CHECKOUT_BUYER).one()
+
+    busiest_store_id, busiest_seller = db.session.query(Store.id, User.username).join(
+        User, User.id == Store.user_id
+    ).join(
+        Product, Product.user_id == Store.user_id
+    ).group_by(Store.id, User.username).order_by(func.count(Product.id).desc()).first()
+    detail_product_id = db.session.query(func.min(Product.id)).filter(Product.is_active.is_(True)).scalar()
+    year_ago = (datetime.utcnow() - timedelta(days=365)).date().isoformat()
+
+    owned_file = db.session.query(ProductFile.product_id, ProductFile.id).join(
+        Order, Order.product_id == ProductFile.product_id
+    ).filter(Order.user_id == heavy_buyer.id, Order.status == 'paid').first()
+
+    # Checkout buys products the checkout buyer does not own yet; each iteration takes fresh ones.
+    # Items left behind by an interrupted run would fail the ownership check, so start empty.
+    CartItem.query.filter(CartItem.cart_id.in_(
+        db.session.query(Cart.id).filter(Cart.user_id == checkout_buyer.id)
+    )).delete(synchronize_session=False)
+    db.session.commit()
+    owned = db.session.query(Entitlement.product_id).filter(Entitlement.user_id == checkout_buyer.id)
+    checkout_pool = iter(db.session.query(Product.id).filter(
+        Product.is_active.is_(True), Product.id.not_in(owned)
+    ).order_by(Product.id.desc()).all())
+
+    def fill_checkout_cart(items=5):
+        cart = Cart.query.filter_by(user_id=checkout_buyer.id).first()
+        if not cart:
+            cart = Cart(user_id=checkout_buyer.id)
+            db.session.add(cart)
+            db.session.flush()
+        for _ in range(items):
+            db.session.add(CartItem(cart_id=cart.id, product_id=next(checkout_pool)[0], quantity=1))
+        db.session.commit()
+
+    scenarios = [
+        Scenario('catalog_newest', 'GET', '/api/products'),
+        Scenario('catalog_price_low', 'GET', '/api/products?sort=price_low'),
+        Scenario('catalog_search', 'GET', '/api/products?search=python%20guide'),
+        Scenario('catalog_grid_fields', 'GET', '/api/products?fields=id,name,price,image_url,store_name'),
+        Scenario('product_detail', 'GET', f'/api/products/{detail_product_id}'),
+        Scenario('store_products', 'GET', f'/api/stores/{busiest_store_id}/products'),
+        Scenario('cart', 'GET', '/api/cart', user=CART_BUYER),
+        Scenario('checkout', 'POST', '/api/checkout/test', user=CHECKOUT_BUYER, setup=fill_checkout_cart),
+        Scenario('my_orders', 'GET', '/api/my-orders', user=HEAVY_BUYER),
+        Scenario('seller_analytics', 'GET', f'/api/analytics/sales?from={year_ago}', user=busiest_seller),
+    ]
+    if owned_file:
+        product_id, file_id = owned_file
+        scenarios.append(Scenario(
+            'download', 'GET', f'/api/products/{product_id}/files/{file_id}/download', user=HEAVY_BUYER
+        ))
+    return scenarios
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_scenario(client, counter, scenario, tokens, iterations, warmup):
+    headers = {}
+    if scenario.user:
+        headers['Authorization'] = f'Bearer {tokens[scenario.user]}'
+
+    timings, queries = [], []
+    for i in range(warmup + iterations):
+        if scenario.setup:
+            scenario.setup()
+        before = counter.count
+        # Keep debug prints in the views from flooding the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            response = client.open(scenario.path, method=scenario.method, headers=headers, json=scenario.body)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != scenario.expect:
+            raise RuntimeError(
+                f"{scenario.name}: expected {scenario.expect}, got {response.status_code}: {response.get_data(as_text=True)[:200]}"
+            )
+        if i >= warmup:
+            timings.append(elapsed)
+            queries.append(counter.count - before)
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'queries': max(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages (latency beyond tolerance, or more queries)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {result['queries']} queries (baseline {base['queries']})")
+        for metric in ('p50_ms', 'p99_ms'):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]} (baseline {base[metric]})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--with-cache', action='store_true', help='Enable the in-process response cache')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline')
+    parser.add_argument('--compare', action='store_true', help='Exit non-zero on regressions vs --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed latency increase (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(cache_backend='memory' if args.with_cache else 'none')
+    from extensions import db
+    from models import User
+    from principal import issue_access_token
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        client = app.test_client()
+        scenarios = build_scenarios(db)
+        if args.only:
+            scenarios = [s for s in scenarios if s.name in args.only]
+        tokens = {
+            user.username: issue_access_token(user)
+            for user in User.query.filter(User.username.in_({s.user for s in scenarios if s.user}))
+        }
+
+        results = {}
+        print(f"{'scenario':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'queries':>9}")
+        for scenario in scenarios:
+            result = run_scenario(client, counter, scenario, tokens, args.iterations, args.warmup)
+            results[scenario.name] = result
+            print(f"{scenario.name:<22}{result['p50_ms']:>10}{result['p99_ms']:>10}{result['mean_ms']:>10}{result['queries']:>9}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}; run with --save-baseline first")
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
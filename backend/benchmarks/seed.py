@@ -0,0 +1,194 @@
+"""Seed a synthetic large-marketplace dataset for the endpoint benchmarks.
+
+Usage (from backend/):
+
+    BENCHMARK_DATABASE_URL=postgresql://localhost/miria_bench python -m benchmarks.seed --reset
+
+Defaults produce 10k stores, 100k products and 1M orders; use --scale to
+shrink everything proportionally for a quick local run (e.g. --scale 0.01).
+The data is generated from a fixed random seed, so every run of the suite
+sees the same marketplace.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, func, select
+from werkzeug.security import generate_password_hash
+
+from benchmarks.common import create_benchmark_app
+
+CHUNK_SIZE = 10000
+WORDS = (
+    'python guide ebook course music album preset template font icon pack '
+    'photography lightroom illustration brush procreate notion planner '
+    'budget spreadsheet recipe workout yoga novel poetry comic game asset '
+    'shader texture sample loop beat podcast script tutorial'
+).split()
+
+# Fixed accounts the benchmark runner logs in as
+HEAVY_BUYER = 'bench_heavy_buyer'
+CART_BUYER = 'bench_cart_buyer'
+CHECKOUT_BUYER = 'bench_checkout_buyer'
+BENCH_PASSWORD = 'benchmark'
+
+
+def chunked_insert(db, model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+    db.session.commit()
+
+
+def seed(db, stores, products, orders, buyers, heavy_buyer_orders, cart_items):
+    from models import User, Store, Product, ProductFile, Order, Cart, CartItem, Entitlement
+
+    rng = random.Random(1337)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+
+    def timestamp(max_days=365):
+        return now - timedelta(seconds=rng.randint(0, max_days * 86400))
+
+    def words(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+    print(f"Seeding {stores} stores, {products} products, {orders} orders, {buyers} buyers")
+
+    # Users: sellers first (ids 1..stores), then buyers, then the fixed benchmark accounts
+    users = [{
+        'username': f'seller{i}', 'email': f'seller{i}@bench.test', 'password_hash': password_hash,
+        'role': 'seller', 'created_at': timestamp()
+    } for i in range(1, stores + 1)]
+    users += [{
+        'username': f'buyer{i}', 'email': f'buyer{i}@bench.test', 'password_hash': password_hash,
+        'role': 'buyer', 'created_at': timestamp()
+    } for i in range(1, buyers + 1)]
+    users += [{
+        'username': name, 'email': f'{name}@bench.test', 'password_hash': password_hash,
+        'role': 'buyer', 'created_at': now
+    } for name in (HEAVY_BUYER, CART_BUYER, CHECKOUT_BUYER)]
+    chunked_insert(db, User, users)
+
+    seller_ids = list(range(1, stores + 1))
+    buyer_ids = list(range(stores + 1, stores + buyers + 1))
+    heavy_buyer_id, cart_buyer_id, _ = range(stores + buyers + 1, stores + buyers + 4)
+
+    chunked_insert(db, Store, [{
+        'user_id': seller_id, 'name': f'{words(2).title()} Studio {seller_id}',
+        'description': words(20), 'created_at': timestamp(), 'updated_at': now
+    } for seller_id in seller_ids])
+
+    product_rows = []
+    for i in range(products):
+        created_at = timestamp()
+        product_rows.append({
+            'user_id': rng.choice(seller_ids), 'name': f'{words(3).title()} {i}',
+            'description': words(rng.randint(30, 120)), 'price': round(rng.uniform(1, 200), 2),
+            'image_url': f'http://localhost:9000/benchmark-public/product_images/{i}.png',
+            'is_active': rng.random() > 0.1, 'created_at': created_at, 'updated_at': created_at
+        })
+    chunked_insert(db, Product, product_rows)
+    product_ids = list(range(1, products + 1))
+
+    file_rows = []
+    for product_id in product_ids:
+        for j in range(rng.randint(0, 3)):
+            file_rows.append({
+                'product_id': product_id,
+                'file_url': f'http://localhost:9000/benchmark-private/products/{product_id}/{j}.zip',
+                'filename': f'file_{j}.zip', 'file_size': rng.randint(10_000, 100_000_000),
+                'content_type': 'application/zip', 'created_at': timestamp()
+            })
+    chunked_insert(db, ProductFile, file_rows)
+
+    def order_row(user_id, email, product_id):
+        status = rng.choices(['paid', 'unpaid', 'cancelled'], weights=[85, 10, 5])[0]
+        return {
+            'user_id': user_id, 'product_id': product_id, 'customer_email': email,
+            'amount_paid': round(rng.uniform(1, 200), 2), 'status': status,
+            'lemon_squeezy_order_id': str(rng.randint(1, 10**9)) if status == 'paid' else None,
+            'created_at': timestamp()
+        }
+
+    for start in range(0, orders, CHUNK_SIZE):
+        rows = []
+        for _ in range(min(CHUNK_SIZE, orders - start)):
+            buyer_id = rng.choice(buyer_ids)
+            rows.append(order_row(buyer_id, f'buyer{buyer_id - stores}@bench.test', rng.choice(product_ids)))
+        db.session.execute(insert(Order), rows)
+        db.session.commit()
+
+    heavy_products = rng.sample(product_ids, min(heavy_buyer_orders, len(product_ids)))
+    heavy_rows = [order_row(heavy_buyer_id, f'{HEAVY_BUYER}@bench.test', pid) for pid in heavy_products]
+    for row in heavy_rows:
+        row['status'] = 'paid'
+    chunked_insert(db, Order, heavy_rows)
+
+    # Entitlements mirror the paid orders, as the webhook would have granted them
+    db.session.execute(insert(Entitlement).from_select(
+        ['user_id', 'product_id', 'granted_at'],
+        select(Order.user_id, Order.product_id, func.min(Order.created_at))
+        .where(Order.status == 'paid').group_by(Order.user_id, Order.product_id)
+    ))
+    db.session.commit()
+    # Sales rollups, as the webhook would have maintained them
+    from services.sales_rollups import rebuild
+    rebuild()
+
+    cart = Cart(user_id=cart_buyer_id, created_at=now, updated_at=now)
+    db.session.add(cart)
+    db.session.flush()
+    chunked_insert(db, CartItem, [{
+        'cart_id': cart.id, 'product_id': pid, 'quantity': 1, 'created_at': now
+    } for pid in rng.sample(product_ids, min(cart_items, len(product_ids)))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every row count by this factor')
+    parser.add_argument('--stores', type=int, default=10_000)
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--buyers', type=int, default=50_000)
+    parser.add_argument('--heavy-buyer-orders', type=int, default=500)
+    parser.add_argument('--cart-items', type=int, default=40)
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    from extensions import db
+    from models import Product
+
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            # Migrations also create what the models don't declare
+            # (the generated search column and trigram index)
+            from flask_migrate import downgrade, upgrade
+            migrations = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+            if args.reset:
+                downgrade(directory=migrations, revision='base')
+            upgrade(directory=migrations)
+        else:
+            if args.reset:
+                db.drop_all()
+            db.create_all()
+
+        if db.session.query(func.count(Product.id)).scalar():
+            parser.error("Benchmark database is not empty; pass --reset to rebuild it")
+
+        started = time.perf_counter()
+        seed(
+            db,
+            stores=max(1, int(args.stores * args.scale)),
+            products=max(1, int(args.products * args.scale)),
+            orders=int(args.orders * args.scale),
+            buyers=max(1, int(args.buyers * args.scale)),
+            heavy_buyer_orders=args.heavy_buyer_orders,
+            cart_items=args.cart_items
+        )
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+from datetime import timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+checkout_cli = AppGroup('checkout', help='Checkout maintenance commands.')
+webhooks_cli = AppGroup('webhooks', help='Webhook event commands.')
+orders_cli = AppGroup('orders', help='Order maintenance commands.')
+analytics_cli = AppGroup('analytics', help='Sales analytics commands.')
+
+
+@checkout_cli.command('retry')
+@click.option('--limit', default=100, show_default=True, help='Maximum number of intents to process.')
+def retry_checkout_intents(limit):
+    """Create provider checkouts for pending intents that are due (run from cron)."""
+    from services.checkout_intents import retry_due
+    processed = retry_due(limit=limit)
+    click.echo(f"Processed {processed} checkout intent(s)")
+
+
+@webhooks_cli.command('process')
+@click.option('--batch-size', default=100, show_default=True, help='Events applied per transaction.')
+def process_webhook_events(batch_size):
+    """Apply recorded webhook events that are still pending."""
+    from services.webhooks import drain
+    processed = drain(batch_size=batch_size)
+    click.echo(f"Processed {processed} webhook event(s)")
+
+
+@orders_cli.command('reap')
+@click.option('--older-than-hours', type=float, default=None,
+              help='Age of unpaid orders to cancel. [default: UNPAID_ORDER_MAX_AGE_HOURS]')
+@click.option('--batch-size', default=500, show_default=True, help='Orders cancelled per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+def reap_unpaid_orders(older_than_hours, batch_size, max_batches):
+    """Cancel unpaid orders left behind by abandoned checkouts (run from cron)."""
+    from services.order_reaper import cancel_stale_unpaid
+    if older_than_hours is None:
+        older_than_hours = current_app.config['UNPAID_ORDER_MAX_AGE_HOURS']
+    cancelled = cancel_stale_unpaid(
+        timedelta(hours=older_than_hours), batch_size=batch_size, max_batches=max_batches
+    )
+    click.echo(f"Cancelled {cancelled} unpaid order(s)")
+
+
+@orders_cli.command('purge-idempotency-keys')
+def purge_idempotency_keys():
+    """Delete expired Idempotency-Key records."""
+    from services.idempotency import purge_expired
+    deleted = purge_expired()
+    click.echo(f"Deleted {deleted} expired idempotency key(s)")
+
+
+@orders_cli.command('backfill-user-ids')
+@click.option('--batch-size', default=1000, show_default=True, help='Order ids covered per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches; rerun to resume.')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to sleep between batches.')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start from the first order.')
+def backfill_order_user_ids(batch_size, max_batches, pause, restart):
+    """Set user_id on old orders from their customer_email (resumable)."""
+    from services.backfill import backfill_order_user_ids
+    updated, done = backfill_order_user_ids(
+        batch_size=batch_size, max_batches=max_batches, pause=pause, restart=restart
+    )
+    click.echo(f"Updated {updated} order(s); " + ("backfill complete" if done else "rerun to continue"))
+
+
+@analytics_cli.command('rebuild')
+@click.option('--seller-id', type=int, default=None, help='Rebuild one seller only.')
+def rebuild_sales_rollups(seller_id):
+    """Recompute the sales rollups from paid orders (recovery)."""
+    from services.sales_rollups import rebuild
+    written = rebuild(seller_id=seller_id)
+    click.echo(f"Wrote {written} sales rollup row(s)")
+
+
+def register_commands(app):
+    app.cli.add_command(checkout_cli)
+    app.cli.add_command(webhooks_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(analytics_cli)
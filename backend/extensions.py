@@ -2,8 +2,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_cors import CORS
+from services.cache import ResponseCache
+from services.lemonsqueezy import LemonSqueezyClient
 
 db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
 cors = CORS()
+cache = ResponseCache()
+lemonsqueezy = LemonSqueezyClient()
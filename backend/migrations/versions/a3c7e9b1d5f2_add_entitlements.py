@@ -0,0 +1,42 @@
+"""Add entitlements
+
+Revision ID: a3c7e9b1d5f2
+Revises: f2b8c4d6a1e3
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c7e9b1d5f2'
+down_revision = 'f2b8c4d6a1e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('entitlements',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('granted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'product_id')
+    )
+
+    # Backfill from paid orders; old orders without user_id are matched by email
+    op.execute("""
+        INSERT INTO entitlements (user_id, product_id, granted_at)
+        SELECT COALESCE(orders.user_id, users.id), orders.product_id,
+               COALESCE(MIN(orders.created_at), CURRENT_TIMESTAMP)
+        FROM orders
+        LEFT JOIN users ON orders.user_id IS NULL AND users.email = orders.customer_email
+        WHERE orders.status = 'paid' AND COALESCE(orders.user_id, users.id) IS NOT NULL
+        GROUP BY COALESCE(orders.user_id, users.id), orders.product_id
+    """)
+
+
+def downgrade():
+    op.drop_table('entitlements')
@@ -0,0 +1,40 @@
+"""Add checkout_intents
+
+Revision ID: b5d9f1a3c7e4
+Revises: a3c7e9b1d5f2
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d9f1a3c7e4'
+down_revision = 'a3c7e9b1d5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('checkout_intents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('order_ids', sa.Text(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('checkout_url', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_checkout_intents_status_next_attempt', 'checkout_intents', ['status', 'next_attempt_at'])
+
+
+def downgrade():
+    op.drop_index('ix_checkout_intents_status_next_attempt', table_name='checkout_intents')
+    op.drop_table('checkout_intents')
@@ -0,0 +1,46 @@
+"""Add sales_rollups
+
+Revision ID: b9d3f7a1c5e2
+Revises: a7c1e5f9b3d8
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d3f7a1c5e2'
+down_revision = 'a7c1e5f9b3d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sales_rollups',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('buyers', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.create_index('ix_sales_rollups_seller_day', 'sales_rollups', ['seller_id', 'day'])
+
+    # Existing paid orders; from here on the webhook keeps the table current
+    op.execute("""
+        INSERT INTO sales_rollups (product_id, day, seller_id, revenue, units, buyers)
+        SELECT orders.product_id, DATE(orders.created_at), products.user_id,
+               SUM(orders.amount_paid), COUNT(orders.id), COUNT(DISTINCT orders.user_id)
+        FROM orders JOIN products ON products.id = orders.product_id
+        WHERE orders.status = 'paid'
+        GROUP BY orders.product_id, DATE(orders.created_at), products.user_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_sales_rollups_seller_day', table_name='sales_rollups')
+    op.drop_table('sales_rollups')
@@ -0,0 +1,34 @@
+"""Add index for reading the orders of a seller's products
+
+Revision ID: c2e6a0b4d8f3
+Revises: b9d3f7a1c5e2
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e6a0b4d8f3'
+down_revision = 'b9d3f7a1c5e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_product_created_at', 'orders', ['product_id', 'created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_product_created_at', table_name='orders',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,45 @@
+"""Add full-text and trigram search indexes to products
+
+Revision ID: c4e2d81f9a37
+Revises: a9d8e7f6c5b4
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e2d81f9a37'
+down_revision = 'a9d8e7f6c5b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Full-text search only exists on PostgreSQL; other backends use the
+    # LIKE fallback in services/search.py and need no schema changes.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Name matches (weight A) rank above description matches (weight B)
+    op.execute("""
+        ALTER TABLE products ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute('CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector)')
+    op.execute('CREATE INDEX ix_products_name_trgm ON products USING GIN (name gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('DROP INDEX IF EXISTS ix_products_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_products_search_vector')
+    op.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,37 @@
+"""Add webhook_events
+
+Revision ID: c8e2a4f6b9d1
+Revises: b5d9f1a3c7e4
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e2a4f6b9d1'
+down_revision = 'b5d9f1a3c7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_key', sa.String(length=255), nullable=False),
+    sa.Column('event_name', sa.String(length=100), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_key')
+    )
+    op.create_index('ix_webhook_events_status_id', 'webhook_events', ['status', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_webhook_events_status_id', table_name='webhook_events')
+    op.drop_table('webhook_events')
@@ -0,0 +1,35 @@
+"""Add partial index for stale unpaid order scans
+
+Revision ID: d4f8b2c6e0a9
+Revises: c8e2a4f6b9d1
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8b2c6e0a9'
+down_revision = 'c8e2a4f6b9d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_unpaid_created_at', 'orders', ['created_at', 'id'],
+            postgresql_where=sa.text("status = 'unpaid'"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_unpaid_created_at', table_name='orders',
+            postgresql_concurrently=True, if_exists=True
+        )
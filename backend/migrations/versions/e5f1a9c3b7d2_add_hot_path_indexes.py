@@ -0,0 +1,55 @@
+"""Add indexes for catalog, ownership and cart lookups
+
+Revision ID: e5f1a9c3b7d2
+Revises: d7a3b5c9e1f0
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f1a9c3b7d2'
+down_revision = 'd7a3b5c9e1f0'
+branch_labels = None
+depends_on = None
+
+
+# carts.user_id and stores.user_id are already covered by their unique constraints.
+INDEXES = [
+    ('ix_products_active_created_at', 'products', ['created_at', 'id'], {'postgresql_where': sa.text('is_active')}),
+    ('ix_products_active_price', 'products', ['price', 'id'], {'postgresql_where': sa.text('is_active')}),
+    ('ix_products_user_created_at', 'products', ['user_id', 'created_at', 'id'], {}),
+    ('ix_products_updated_at', 'products', ['updated_at'], {}),
+    ('ix_product_files_product_id', 'product_files', ['product_id'], {}),
+    ('ix_orders_customer_email_status', 'orders', ['customer_email', 'status'], {}),
+    ('ix_orders_user_product_status', 'orders', ['user_id', 'product_id', 'status'], {}),
+    ('ix_cart_items_cart_product', 'cart_items', ['cart_id', 'product_id'], {'unique': True}),
+]
+
+
+def upgrade():
+    # The unique cart index needs duplicate (cart, product) rows gone first;
+    # keep the oldest row of each pair.
+    op.execute("""
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT MIN(id) FROM cart_items GROUP BY cart_id, product_id
+        )
+    """)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,34 @@
+"""Add index for paging a user's orders
+
+Revision ID: f0b4d8e2a6c1
+Revises: e6a0c4d8f2b5
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0b4d8e2a6c1'
+down_revision = 'e6a0c4d8f2b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_user_created_at', 'orders', ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_user_created_at', table_name='orders',
+            postgresql_concurrently=True, if_exists=True
+        )
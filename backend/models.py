@@ -10,10 +10,21 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, default='buyer')  # admin, seller, buyer
     profile_picture = db.Column(db.Text, nullable=True)  # Store URL from MinIO
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped to revoke every access token issued before (e.g. on a role change)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     products = db.relationship('Product', backref='user', lazy=True)
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Public catalog orderings (routes/product.py PRODUCT_SORT_ORDERS), active rows only on Postgres
+        db.Index('ix_products_active_created_at', 'created_at', 'id', postgresql_where=db.text('is_active')),
+        db.Index('ix_products_active_price', 'price', 'id', postgresql_where=db.text('is_active')),
+        # Seller product lists and store pages
+        db.Index('ix_products_user_created_at', 'user_id', 'created_at', 'id'),
+        # max(updated_at) validators for conditional GETs
+        db.Index('ix_products_updated_at', 'updated_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -29,7 +40,7 @@ class Product(db.Model):
 class ProductFile(db.Model):
     __tablename__ = 'product_files'
     id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
     file_url = db.Column(db.String(500), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
@@ -38,6 +49,17 @@ class ProductFile(db.Model):
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_customer_email_status', 'customer_email', 'status'),
+        # Ownership checks: "has this user paid for this product?"
+        db.Index('ix_orders_user_product_status', 'user_id', 'product_id', 'status'),
+        # My Orders: a user's orders newest first, paged by (created_at, id)
+        db.Index('ix_orders_user_created_at', 'user_id', 'created_at', 'id'),
+        # The unpaid-order reaper scans only abandoned checkouts, oldest first
+        db.Index('ix_orders_unpaid_created_at', 'created_at', 'id', postgresql_where=db.text("status = 'unpaid'")),
+        # Seller order exports and rollup rebuilds: orders of given products
+        db.Index('ix_orders_product_created_at', 'product_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True) # Check if we can make it false later
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
@@ -55,6 +77,7 @@ class Store(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user = db.relationship('User', backref=db.backref('store', uselist=False), lazy=True)
 
 class Cart(db.Model):
@@ -68,9 +91,94 @@ class Cart(db.Model):
 
 class CartItem(db.Model):
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        db.Index('ix_cart_items_cart_product', 'cart_id', 'product_id', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     cart_id = db.Column(db.Integer, db.ForeignKey('carts.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     product = db.relationship('Product', backref='cart_items', lazy=True)
+
+class Entitlement(db.Model):
+    """A product the user owns (granted when an order for it is paid)"""
+    __tablename__ = 'entitlements'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    granted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class CheckoutIntent(db.Model):
+    """A provider checkout being created in the background for already-committed orders"""
+    __tablename__ = 'checkout_intents'
+    __table_args__ = (
+        # The retry sweep: pending intents whose next attempt is due
+        db.Index('ix_checkout_intents_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    order_ids = db.Column(db.Text, nullable=False)  # JSON list
+    payload = db.Column(db.Text, nullable=False)  # JSON body for POST /checkouts
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, ready, failed
+    checkout_url = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class WebhookEvent(db.Model):
+    """A verified provider webhook, stored on receipt and applied later in batches"""
+    __tablename__ = 'webhook_events'
+    __table_args__ = (
+        db.Index('ix_webhook_events_status_id', 'status', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    # event_name:data.id, or a hash of the body; provider retries map to the same key
+    event_key = db.Column(db.String(255), nullable=False, unique=True)
+    event_name = db.Column(db.String(100), nullable=True)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processed, ignored, failed
+    last_error = db.Column(db.Text, nullable=True)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+class IdempotencyKey(db.Model):
+    """The stored outcome of a POST sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256 of method, path and body
+    status = db.Column(db.String(20), nullable=False, default='in_progress')  # in_progress, completed
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    response_mimetype = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class BackfillCheckpoint(db.Model):
+    """Progress of a resumable data backfill: the last primary key it processed"""
+    __tablename__ = 'backfill_checkpoints'
+    name = db.Column(db.String(100), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SalesRollup(db.Model):
+    """Paid sales of one product on one day (the order date), kept current as orders are paid"""
+    __tablename__ = 'sales_rollups'
+    __table_args__ = (
+        # Seller dashboards: one seller's rows over a date range
+        db.Index('ix_sales_rollups_seller_day', 'seller_id', 'day'),
+    )
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    buyers = db.Column(db.Integer, nullable=False, default=0)
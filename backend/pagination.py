@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+class PaginationError(ValueError):
+    """Raised when a client sends a malformed cursor or limit"""
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse the `limit` query parameter, clamped to [1, maximum]"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError("Invalid limit")
+    if limit <= 0:
+        raise PaginationError("Limit must be positive")
+    return min(limit, maximum)
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page into an opaque token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor produced by encode_cursor() for the given sort columns"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, UnicodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def _coerce(column, value):
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def _after(order, values):
+    """Filter selecting rows strictly after `values` in the given ordering"""
+    columns = [column for column, _ in order]
+    directions = {descending for _, descending in order}
+
+    if len(directions) == 1:
+        # Uniform direction: a row-value comparison lets the database walk the
+        # composite index straight to the start of the page.
+        descending = directions.pop()
+        lhs, rhs = tuple_(*columns), tuple_(*values)
+        return lhs < rhs if descending else lhs > rhs
+
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, order, cursor=None, limit=DEFAULT_PAGE_SIZE, row_values=None):
+    """Apply keyset pagination to a query.
+
+    `order` is a list of (column, descending) pairs whose last entry must be a
+    unique tiebreaker (normally the primary key). Returns (rows, next_cursor);
+    next_cursor is None on the last page.
+
+    `row_values` extracts the sort values from a result row; by default each
+    column is read as an attribute of the row, which covers single-entity queries.
+    """
+    columns = [column for column, _ in order]
+
+    if cursor:
+        query = query.filter(_after(order, decode_cursor(cursor, columns)))
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c, descending in order])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if row_values:
+            values = row_values(last)
+        else:
+            values = [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values)
+
+    return rows, next_cursor
@@ -0,0 +1,106 @@
+from flask import g
+from flask_jwt_extended import create_access_token, get_jwt
+from extensions import db, cache
+from models import User, Store
+
+# How long a worker trusts its cached copy of a user's token version. A bump
+# is seen at once by the worker that made it (and by every worker with the
+# redis cache backend); other in-process caches pick it up within this window.
+TOKEN_VERSION_TTL = 30
+
+
+class Principal:
+    """The authenticated caller, as described by the access token's claims.
+
+    id, role, email and store_id come straight from the signed token, so
+    handlers that only need those never touch the users table. `user` loads
+    the full row on first access for the handlers that do.
+    """
+
+    def __init__(self, id, role, email, store_id):
+        self.id = id
+        self.role = role
+        self.email = email
+        self.store_id = store_id
+        self._user = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = User.query.get(self.id)
+        return self._user
+
+    @property
+    def is_seller(self):
+        return self.role in ('seller', 'admin')
+
+
+def token_claims(user):
+    store_id = db.session.query(Store.id).filter_by(user_id=user.id).scalar()
+    return {
+        'role': user.role,
+        'email': user.email,
+        'store_id': store_id,
+        'tv': user.token_version or 0,
+    }
+
+
+def issue_access_token(user):
+    return create_access_token(identity=str(user.id), additional_claims=token_claims(user))
+
+
+def current_principal():
+    """Return the Principal for the current request (inside @jwt_required)"""
+    claims = get_jwt()
+    # Keyed by jti: g outlives a single request when an app context is already pushed
+    cached = g.get('_principal')
+    if cached is None or cached[0] != claims['jti']:
+        user_id = int(claims['sub'])
+        if 'role' in claims:
+            principal = Principal(user_id, claims['role'], claims['email'], claims.get('store_id'))
+        else:
+            # Tokens issued before claims were embedded: fall back to the row
+            user = User.query.get(user_id)
+            principal = Principal(user_id, user.role, user.email, user.store.id if user.store else None)
+            principal._user = user
+        g._principal = cached = (claims['jti'], principal)
+    return cached[1]
+
+
+def _token_version_key(user_id):
+    return f"token-version:{user_id}"
+
+
+def get_token_version(user_id):
+    """Current token version of a user, or None if the user no longer exists"""
+    version = cache.get(_token_version_key(user_id))
+    if version is None:
+        version = db.session.query(User.token_version).filter_by(id=user_id).scalar()
+        if version is not None:
+            cache.set(_token_version_key(user_id), version, TOKEN_VERSION_TTL)
+    return version
+
+
+def bump_token_version(user):
+    """Revoke every token issued to `user` so far.
+
+    Commit the session, then call forget_token_version(user.id) so the
+    cached version is dropped.
+    """
+    user.token_version = (user.token_version or 0) + 1
+
+
+def forget_token_version(user_id):
+    cache.delete(_token_version_key(user_id))
+
+
+def register_jwt_callbacks(jwt):
+    @jwt.token_in_blocklist_loader
+    def token_is_revoked(jwt_header, jwt_payload):
+        # Tokens from before token versions existed carry none and count as version 0
+        current = get_token_version(int(jwt_payload['sub']))
+        return current is None or jwt_payload.get('tv', 0) != current
+
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return {"message": "Token has been revoked", "code": "token_revoked"}, 401
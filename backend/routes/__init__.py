@@ -8,3 +8,5 @@ from . import product
 from . import cart
 from . import payment
 from . import orders
+from . import analytics
+from . import exports
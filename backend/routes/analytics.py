@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import distinct, func
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required
+from . import api_bp
+from extensions import db
+from models import Order, Product, SalesRollup
+from principal import current_principal
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _parse_day(value, default):
+    if not value:
+        return default
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+@api_bp.route('/analytics/sales', methods=['GET'])
+@jwt_required()
+def get_sales_analytics():
+    """Revenue, units and buyers per product per day for the current seller.
+
+    `from` and `to` (YYYY-MM-DD, inclusive) default to the last 30 days, and
+    `product_id` narrows the report to one product. Days are order dates.
+    Revenue, units and the daily rows come from sales_rollups, so their cost
+    grows with days x products, not with the number of orders. Buyers over the
+    whole range can't be summed from per-day counts (a buyer returning on
+    another day would count twice); they are counted from the paid orders of
+    the products that sold, over ix_orders_product_created_at.
+    """
+    principal = current_principal()
+    if not principal.is_seller:
+        return jsonify({"message": "Only sellers can view sales analytics"}), 403
+
+    try:
+        end = _parse_day(request.args.get('to'), datetime.utcnow().date())
+        start = _parse_day(request.args.get('from'), end - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    except ValueError:
+        return jsonify({"message": "Dates must be YYYY-MM-DD"}), 400
+    if start > end:
+        return jsonify({"message": "`from` must not be after `to`"}), 400
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return jsonify({"message": f"Date range is limited to {MAX_RANGE_DAYS} days"}), 400
+
+    query = SalesRollup.query.filter(
+        SalesRollup.seller_id == principal.id,
+        SalesRollup.day >= start,
+        SalesRollup.day <= end
+    )
+    product_id = request.args.get('product_id', type=int)
+    if product_id is not None:
+        query = query.filter(SalesRollup.product_id == product_id)
+    rows = query.order_by(SalesRollup.day, SalesRollup.product_id).all()
+
+    per_product = defaultdict(lambda: {'revenue': 0.0, 'units': 0, 'buyers': 0})
+    for row in rows:
+        entry = per_product[row.product_id]
+        entry['revenue'] += row.revenue
+        entry['units'] += row.units
+
+    names = {}
+    if per_product:
+        names = dict(db.session.query(Product.id, Product.name).filter(Product.id.in_(per_product.keys())))
+        buyers = db.session.query(Order.product_id, func.count(distinct(Order.user_id))).filter(
+            Order.product_id.in_(per_product.keys()),
+            Order.created_at >= datetime.combine(start, datetime.min.time()),
+            Order.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+            Order.status == 'paid'
+        ).group_by(Order.product_id)
+        for pid, count in buyers:
+            per_product[pid]['buyers'] = count
+
+    products = sorted((
+        {'id': pid, 'name': names.get(pid), **entry, 'revenue': round(entry['revenue'], 2)}
+        for pid, entry in per_product.items()
+    ), key=lambda p: (-p['revenue'], p['id']))
+
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'totals': {
+            'revenue': round(sum(p['revenue'] for p in products), 2),
+            'units': sum(p['units'] for p in products)
+        },
+        'products': products,
+        'daily': [{
+            'date': row.day.isoformat(),
+            'product_id': row.product_id,
+            'revenue': round(row.revenue, 2),
+            'units': row.units,
+            'buyers': row.buyers
+        } for row in rows]
+    }), 200
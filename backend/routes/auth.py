@@ -1,9 +1,10 @@
 from flask import request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from . import api_bp
 from extensions import db
 from models import User
+from principal import current_principal, issue_access_token
 
 
 @api_bp.route('/register', methods=['POST'])
@@ -54,14 +55,13 @@ def login():
     if not user or not check_password_hash(user.password_hash, password):
         return jsonify({"message": "Invalid credentials"}), 401
 
-    access_token = create_access_token(identity=str(user.id))
+    access_token = issue_access_token(user)
     return jsonify(access_token=access_token)
 
 @api_bp.route('/profile')
 @jwt_required()
 def profile():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
+    user = current_principal().user
     
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -94,8 +94,7 @@ def get_user_profile(username):
 @jwt_required()
 def update_profile():
     """Update the current user's profile"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_principal().user
     
     if not user:
         return jsonify({"message": "User not found"}), 404
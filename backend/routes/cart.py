@@ -1,71 +1,86 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 from . import api_bp
 from extensions import db
-from models import Cart, CartItem, Product, User, Store, Order
+from models import Cart, CartItem, Product, User, Store
+from principal import current_principal
+from services import entitlements
+from services.bulk import insert_ignore
 from datetime import datetime
 
 @api_bp.route('/cart', methods=['GET'])
 @jwt_required()
 def get_cart():
-    """Get the current user's cart"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user:
+    """Get the current user's cart.
+
+    The user, cart, items, products and stores come back from one joined
+    query, with the totals computed by window functions over the same rows.
+    Users without a cart get an empty one; nothing is written on read.
+    """
+    current_user_id = current_principal().id
+
+    line_total = Product.price * CartItem.quantity
+    rows = db.session.query(
+        User.id.label('user_id'),
+        Cart.id.label('cart_id'),
+        Cart.created_at.label('cart_created_at'),
+        Cart.updated_at.label('cart_updated_at'),
+        CartItem.id.label('item_id'),
+        CartItem.product_id,
+        CartItem.quantity,
+        CartItem.created_at.label('item_created_at'),
+        Product.name.label('product_name'),
+        Product.price.label('product_price'),
+        Product.image_url.label('product_image_url'),
+        line_total.label('total'),
+        Store.id.label('store_id'),
+        Store.name.label('store_name'),
+        func.count(Product.id).over().label('total_items'),
+        func.coalesce(func.sum(line_total).over(), 0).label('total_price')
+    ).select_from(User).outerjoin(
+        Cart, Cart.user_id == User.id
+    ).outerjoin(
+        CartItem, CartItem.cart_id == Cart.id
+    ).outerjoin(
+        Product, Product.id == CartItem.product_id
+    ).outerjoin(
+        Store, Store.user_id == Product.user_id
+    ).filter(User.id == current_user_id).order_by(CartItem.id).all()
+
+    if not rows:
         return jsonify({"message": "User not found"}), 404
 
-    # Find or create cart for the user
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
-
-    if not cart:
-        # Create a new cart if one doesn't exist
-        cart = Cart()
-        cart.user_id = current_user_id
-        db.session.add(cart)
-        db.session.commit()
-
-    # Get cart items with product details
-    cart_items = []
-    total_price = 0.0
-
-    for item in cart.items:
-        product = Product.query.get(item.product_id)
-        if product:
-            item_total = product.price * item.quantity
-            cart_items.append({
-                'id': item.id,
-                'product_id': item.product_id,
-                'product_name': product.name,
-                'product_price': product.price,
-                'product_image_url': product.image_url,
-                'quantity': item.quantity,
-                'total': item_total,
-                'created_at': item.created_at.isoformat() if item.created_at else None,
-                'store_name': product.user.store.name if product.user and product.user.store else 'Unknown Store',
-                'store_id': product.user.store.id if product.user and product.user.store else None
-            })
-            total_price += item_total
+    first = rows[0]
+    # Items whose product no longer exists are left out, as are their totals
+    cart_items = [{
+        'id': row.item_id,
+        'product_id': row.product_id,
+        'product_name': row.product_name,
+        'product_price': row.product_price,
+        'product_image_url': row.product_image_url,
+        'quantity': row.quantity,
+        'total': row.total,
+        'created_at': row.item_created_at.isoformat() if row.item_created_at else None,
+        'store_name': row.store_name or 'Unknown Store',
+        'store_id': row.store_id
+    } for row in rows if row.product_name is not None]
 
     return jsonify({
-        'cart_id': cart.id,
-        'user_id': cart.user_id,
+        'cart_id': first.cart_id,
+        'user_id': first.user_id,
         'items': cart_items,
-        'total_items': len(cart_items),
-        'total_price': round(total_price, 2),
-        'created_at': cart.created_at.isoformat() if cart.created_at else None,
-        'updated_at': cart.updated_at.isoformat() if cart.updated_at else None
+        'total_items': first.total_items,
+        'total_price': round(first.total_price, 2),
+        'created_at': first.cart_created_at.isoformat() if first.cart_created_at else None,
+        'updated_at': first.cart_updated_at.isoformat() if first.cart_updated_at else None
     })
 
 @api_bp.route('/cart/items', methods=['POST'])
 @jwt_required()
 def add_to_cart():
     """Add an item to the cart"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    current_user_id = current_principal().id
 
     data = request.get_json()
     product_id = data.get('product_id')
@@ -80,14 +95,7 @@ def add_to_cart():
         return jsonify({"message": "Product not found"}), 404
 
     # Check if user already owns the product
-    # Prefer user_id check if available, matching payment.py logic
-    existing_paid = Order.query.filter(
-        Order.user_id == user.id,
-        Order.product_id == product_id,
-        Order.status == 'paid'
-    ).first()
-    
-    if existing_paid:
+    if entitlements.owns(current_user_id, product.id):
         return jsonify({"message": "You already own this product.", "code": "already_owned"}), 400
 
     # Find or create cart for the user
@@ -126,11 +134,7 @@ def add_to_cart():
 @jwt_required()
 def update_cart_item(item_id):
     """Update cart item quantity"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    current_user_id = current_principal().id
 
     data = request.get_json()
     quantity = data.get('quantity')
@@ -170,11 +174,7 @@ def update_cart_item(item_id):
 @jwt_required()
 def remove_from_cart(item_id):
     """Remove an item from the cart"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    current_user_id = current_principal().id
 
     # Find the cart item
     cart_item = CartItem.query.get(item_id)
@@ -197,11 +197,7 @@ def remove_from_cart(item_id):
 @jwt_required()
 def clear_cart():
     """Clear the entire cart"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    current_user_id = current_principal().id
 
     # Find the user's cart
     cart = Cart.query.filter_by(user_id=current_user_id).first()
@@ -218,70 +214,81 @@ def clear_cart():
 @api_bp.route('/cart/merge', methods=['POST'])
 @jwt_required()
 def merge_cart():
-    """Merge local cart items into user's cloud cart"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    """Merge local cart items into user's cloud cart.
 
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-
-    # Find or create cart for the user
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
-    if not cart:
-        cart = Cart()
-        cart.user_id = current_user_id
-        db.session.add(cart)
-        db.session.commit()
+    The whole batch is merged set-wise: one query validates the product ids,
+    one loads the items already in the cart, and the missing ones go in with
+    a single bulk insert. Items that could not be merged are reported under
+    `skipped` with a reason (invalid, duplicate or not_found).
+    """
+    current_user_id = current_principal().id
 
     data = request.get_json()
     local_items = data.get('items', [])
-    
+
     if not isinstance(local_items, list):
          return jsonify({"message": "Items must be a list"}), 400
 
-    merged_count = 0
-    
+    skipped = []
+    requested_ids = []
     for local_item in local_items:
-        product_id = local_item.get('product_id')
-        quantity = local_item.get('quantity')
-        
-        if not product_id or not quantity:
-            continue
-            
+        product_id = local_item.get('product_id') if isinstance(local_item, dict) else None
+        quantity = local_item.get('quantity') if isinstance(local_item, dict) else None
+
         try:
+            product_id = int(product_id)
             quantity = int(quantity)
-            if quantity <= 0:
-                continue
-        except ValueError:
+        except (TypeError, ValueError):
+            skipped.append({"product_id": product_id, "reason": "invalid"})
+            continue
+        if product_id <= 0 or quantity <= 0:
+            skipped.append({"product_id": product_id, "reason": "invalid"})
             continue
 
-        # Check if product exists
-        product = Product.query.get(product_id)
-        if not product:
+        if product_id in requested_ids:
+            skipped.append({"product_id": product_id, "reason": "duplicate"})
             continue
-            
-        # Check if item already exists in cart
-        existing_item = CartItem.query.filter_by(cart_id=cart.id, product_id=product_id).first()
-        
-        if existing_item:
-            # Limit quantity to 1 during merge for general users
-            existing_item.quantity = 1
-        else:
-            # New item, limit quantity to 1
-            new_item = CartItem(
-                cart_id=cart.id,
-                product_id=product_id,
-                quantity=1
-            )
-            db.session.add(new_item)
-        
-        merged_count += 1
+        requested_ids.append(product_id)
 
-    cart.updated_at = datetime.utcnow()
+    # Find or create cart for the user
+    cart = Cart.query.filter_by(user_id=current_user_id).first()
+    if not cart:
+        cart = Cart(user_id=current_user_id)
+        db.session.add(cart)
+        db.session.flush()
+
+    found_ids = {
+        product_id for (product_id,) in
+        db.session.query(Product.id).filter(Product.id.in_(requested_ids))
+    } if requested_ids else set()
+    for product_id in requested_ids:
+        if product_id not in found_ids:
+            skipped.append({"product_id": product_id, "reason": "not_found"})
+
+    in_cart = dict(
+        db.session.query(CartItem.product_id, CartItem.quantity).filter(
+            CartItem.cart_id == cart.id, CartItem.product_id.in_(found_ids)
+        )
+    ) if found_ids else {}
+
+    # Limit quantity to 1 during merge for general users
+    to_reset = [product_id for product_id, quantity in in_cart.items() if quantity != 1]
+    if to_reset:
+        CartItem.query.filter(
+            CartItem.cart_id == cart.id, CartItem.product_id.in_(to_reset)
+        ).update({CartItem.quantity: 1}, synchronize_session=False)
+
+    now = datetime.utcnow()
+    insert_ignore(CartItem, [
+        {"cart_id": cart.id, "product_id": product_id, "quantity": 1, "created_at": now}
+        for product_id in requested_ids if product_id in found_ids and product_id not in in_cart
+    ], ['cart_id', 'product_id'])
+
+    cart.updated_at = now
     db.session.commit()
-    
+
     return jsonify({
         "message": "Cart merged successfully",
-        "merged_count": merged_count
+        "merged_count": len(found_ids),
+        "skipped": skipped
     })
-
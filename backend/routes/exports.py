@@ -0,0 +1,69 @@
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from . import api_bp
+from models import Order, Product
+from principal import current_principal
+from services.exports import ExportError, export_response, parse_format, parse_since
+
+ORDER_EXPORT_COLUMNS = ('order_id', 'provider_order_id', 'created_at', 'status', 'product_id', 'product_name', 'amount_paid')
+PRODUCT_EXPORT_COLUMNS = ('id', 'name', 'description', 'price', 'is_active', 'image_url', 'created_at', 'updated_at')
+
+
+@api_bp.route('/exports/orders', methods=['GET'])
+@jwt_required()
+def export_orders():
+    """Download the orders for the current seller's products as CSV or NDJSON.
+
+    `format` is csv (default) or ndjson, `since` keeps orders created at or
+    after it, and `status` defaults to paid (`all` for every order).
+    """
+    principal = current_principal()
+    if not principal.is_seller:
+        return jsonify({"message": "Only sellers can export orders"}), 403
+
+    try:
+        fmt = parse_format(request.args.get('format'))
+        since = parse_since(request.args.get('since'))
+    except ExportError as e:
+        return jsonify({"message": str(e)}), 400
+
+    statement = select(
+        Order.id, Order.lemon_squeezy_order_id, Order.created_at, Order.status,
+        Order.product_id, Product.name, Order.amount_paid
+    ).join(Product, Product.id == Order.product_id).where(Product.user_id == principal.id)
+
+    status = request.args.get('status', 'paid')
+    if status != 'all':
+        statement = statement.where(Order.status == status)
+    if since:
+        statement = statement.where(Order.created_at >= since)
+
+    return export_response('orders', ORDER_EXPORT_COLUMNS, statement.order_by(Order.id), fmt)
+
+
+@api_bp.route('/exports/products', methods=['GET'])
+@jwt_required()
+def export_products():
+    """Download the current seller's products as CSV or NDJSON.
+
+    `since` keeps products updated at or after it.
+    """
+    principal = current_principal()
+    if not principal.is_seller:
+        return jsonify({"message": "Only sellers can export products"}), 403
+
+    try:
+        fmt = parse_format(request.args.get('format'))
+        since = parse_since(request.args.get('since'))
+    except ExportError as e:
+        return jsonify({"message": str(e)}), 400
+
+    statement = select(
+        Product.id, Product.name, Product.description, Product.price, Product.is_active,
+        Product.image_url, Product.created_at, Product.updated_at
+    ).where(Product.user_id == principal.id)
+    if since:
+        statement = statement.where(Product.updated_at >= since)
+
+    return export_response('products', PRODUCT_EXPORT_COLUMNS, statement.order_by(Product.id), fmt)
@@ -1,52 +1,96 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import joinedload, load_only
 from . import api_bp
 from extensions import db
-from models import Order, User, Product, ProductFile
+from models import Order, Product, ProductFile
+from pagination import PaginationError, keyset_paginate, parse_limit
+from principal import current_principal
+from serializers import FieldsError, parse_fields, serialize_product_file, serialize_value
+
+ORDER_FIELDS = ('id', 'order_id', 'amount_paid', 'status', 'created_at', 'product')
+ORDER_PRODUCT_FIELDS = ('id', 'name', 'description', 'price', 'files')
+# Response field -> orders column
+_ORDER_COLUMNS = {
+    'id': 'id',
+    'order_id': 'lemon_squeezy_order_id',
+    'amount_paid': 'amount_paid',
+    'status': 'status',
+    'created_at': 'created_at',
+}
 
 @api_bp.route('/my-orders', methods=['GET'])
 @jwt_required()
 def get_my_orders():
-    """Get orders for the current user, filtered by status"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    """Get a page of the current user's orders, newest first, filtered by status.
+
+    Returns {items, next_cursor}; pass next_cursor back as `cursor` for the
+    next page. `fields` selects a sparse fieldset; nested product fields are addressed
+    as product.<name> (e.g. fields=id,status,product.name), and `product`
+    alone means the whole product.
+    """
+    principal = current_principal()
+
+    try:
+        fields = parse_fields(
+            request.args.get('fields'),
+            ORDER_FIELDS + tuple(f'product.{name}' for name in ORDER_PRODUCT_FIELDS)
+        ) or set(ORDER_FIELDS)
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if 'product' in fields:
+        product_fields = set(ORDER_PRODUCT_FIELDS)
+    else:
+        product_fields = {name.split('.', 1)[1] for name in fields if name.startswith('product.')}
 
     status = request.args.get('status', 'paid')
-    
-    # Fetch orders by email and status
-    query = Order.query.filter_by(customer_email=user.email)
-    
+
+    # Served by ix_orders_user_created_at; each page is one index range scan
+    query = Order.query.filter_by(user_id=principal.id)
+
     if status != 'all':
         query = query.filter_by(status=status)
-        
-    orders = query.order_by(Order.created_at.desc()).all()
-    
+
+    columns = {'id', 'product_id', 'created_at'} | {_ORDER_COLUMNS[name] for name in fields if name in _ORDER_COLUMNS}
+    query = query.options(load_only(*[getattr(Order, name) for name in sorted(columns)]))
+
+    # Products (and their files) are loaded up front, and only when asked for
+    if product_fields:
+        product_columns = {'id'} | (product_fields & {'name', 'description', 'price'})
+        product_load = joinedload(Order.product).load_only(*[getattr(Product, name) for name in sorted(product_columns)])
+        if 'files' in product_fields:
+            product_load = product_load.selectinload(Product.files).load_only(
+                ProductFile.id, ProductFile.filename, ProductFile.file_size, ProductFile.content_type
+            )
+        query = query.options(product_load)
+
+    try:
+        orders, next_cursor = keyset_paginate(
+            query,
+            [(Order.created_at, True), (Order.id, True)],
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'))
+        )
+    except PaginationError as e:
+        return jsonify({"message": str(e)}), 400
+
     orders_data = []
     for order in orders:
-        product = order.product
-        # Only include if product still exists
-        if product:
-            orders_data.append({
-                'id': order.id,
-                'order_id': order.lemon_squeezy_order_id,
-                'amount_paid': order.amount_paid,
-                'status': order.status,
-                'created_at': order.created_at.isoformat(),
-                'product': {
-                    'id': product.id,
-                    'name': product.name,
-                    'description': product.description,
-                    'price': product.price,
-                    'files': [{
-                        'id': f.id,
-                        'filename': f.filename,
-                        'file_size': f.file_size,
-                        'content_type': f.content_type
-                    } for f in product.files]
-                }
-            })
-            
-    return jsonify(orders_data), 200
+        data = {name: serialize_value(getattr(order, column)) for name, column in _ORDER_COLUMNS.items() if name in fields}
+
+        if product_fields:
+            product = order.product
+            # Only include if product still exists
+            if not product:
+                continue
+            data['product'] = {name: getattr(product, name) for name in ('id', 'name', 'description', 'price') if name in product_fields}
+            if 'files' in product_fields:
+                data['product']['files'] = [serialize_product_file(f) for f in product.files]
+
+        orders_data.append(data)
+
+    return jsonify({
+        'items': orders_data,
+        'next_cursor': next_cursor
+    }), 200
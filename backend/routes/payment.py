@@ -4,91 +4,81 @@ import hmac
 import requests
 import json
 from datetime import datetime
-from flask import request, jsonify, redirect
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import current_app, request, jsonify, redirect
+from flask_jwt_extended import jwt_required
 from . import api_bp
-from extensions import db
-from models import User, Cart, Order, Product
+from extensions import db, lemonsqueezy
+from sqlalchemy import insert
+from models import Cart, CartItem, CheckoutIntent, Order, Product
+from principal import current_principal
+from services import checkout_intents, entitlements, sales_rollups, webhooks
+from services.idempotency import idempotent
 
-LEMONSQUEEZY_API_URL = "https://api.lemonsqueezy.com/v1"
 
-@api_bp.route('/checkout', methods=['POST'])
-@jwt_required()
-def create_checkout_session():
-    """Create a Lemon Squeezy checkout session"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+def _cart_lines(user_id):
+    """Load the user's cart items with their product name and price in one query.
 
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
-    if not cart or not cart.items:
-        return jsonify({"message": "Cart is empty"}), 400
+    Returns (cart_id, lines); items whose product no longer exists are left out.
+    """
+    rows = db.session.query(
+        Cart.id.label('cart_id'),
+        CartItem.product_id,
+        CartItem.quantity,
+        Product.name,
+        Product.price
+    ).outerjoin(CartItem, CartItem.cart_id == Cart.id).outerjoin(
+        Product, Product.id == CartItem.product_id
+    ).filter(Cart.user_id == user_id).order_by(CartItem.id).all()
 
-    store_id = os.getenv('LEMONSQUEEZY_STORE_ID')
-    variant_id = os.getenv('LEMONSQUEEZY_VARIANT_ID')
-    api_key = os.getenv('LEMONSQUEEZY_API_KEY')
+    cart_id = rows[0].cart_id if rows else None
+    return cart_id, [row for row in rows if row.name is not None]
 
-    if not all([store_id, variant_id, api_key]):
-        return jsonify({"message": "Server misconfiguration: Lemon Squeezy keys missing"}), 500
 
-    print(f"DEBUG: creating checkout for user {user.id}, cart {cart.id}")
+def _validate_cart_lines(user_id, lines):
+    """Return an error response if any item can't be bought, else None"""
+    owned = entitlements.owned_among(user_id, [line.product_id for line in lines])
+    for line in lines:
+        # 1. Quantity Check
+        if line.quantity > 1:
+            return jsonify({"message": "One product is only able to buy and own one for an account.", "code": "quantity_limit"}), 400
 
-    # Calculate total and Create Unpaid Orders
-    total_amount = 0
-    description = []
-    created_order_ids = []
+        # 2. Ownership Check
+        if line.product_id in owned:
+            return jsonify({"message": "You already own this product.", "code": "already_owned"}), 400
+    return None
 
-    try:
-        for item in cart.items:
-            # 1. Quantity Check
-            if item.quantity > 1:
-                return jsonify({"message": "One product is only be able to buy and own one for an account.", "code": "quantity_limit"}), 400
-
-            # 2. Ownership Check
-            existing_order = Order.query.filter_by(user_id=user.id, product_id=item.product_id, status='paid').first()
-            if existing_order:
-                 return jsonify({"message": "You already own this product.", "code": "already_owned"}), 400
-
-            product = Product.query.get(item.product_id)
-            if product:
-                total_amount += product.price * item.quantity
-                description.append(f"{item.quantity}x {product.name}")
-                
-                # Create Order Immediately
-                new_order = Order(
-                    user_id=user.id,
-                    product_id=item.product_id,
-                    customer_email=user.email,
-                    amount_paid=product.price * item.quantity,
-                    status='unpaid',
-                    tappay_trade_id="PENDING_LEMON"
-                )
-                db.session.add(new_order)
-                db.session.flush() # Get ID
-                created_order_ids.append(new_order.id)
-        
-        # Clear Cart
-        for item in cart.items:
-            db.session.delete(item)
-            
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"message": f"Failed to create order records: {str(e)}"}), 500
-    
+
+def _placed_by(order, principal):
+    """Whether the order belongs to the caller.
+
+    Orders from before orders.user_id keep matching by customer_email until
+    `flask orders backfill-user-ids` has filled them in.
+    """
+    if order.user_id is None:
+        return order.customer_email == principal.email
+    return order.user_id == principal.id
+
+
+def _insert_orders(rows):
+    """Insert all orders in one statement and return their ids in row order"""
+    result = db.session.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True), rows)
+    return result.scalars().all()
+
+def _checkout_payload(user_id, order_ids, total_amount, description):
+    """Body for POST /checkouts covering the given orders"""
+    store_id = os.getenv('LEMONSQUEEZY_STORE_ID')
+    variant_id = os.getenv('LEMONSQUEEZY_VARIANT_ID')
     total_price_cents = int(total_amount * 100) # No tax
-    
-    payload = {
+
+    return {
         "data": {
             "type": "checkouts",
             "attributes": {
                 "custom_price": total_price_cents,
                 "checkout_data": {
                     "custom": {
-                        "user_id": str(user.id),
-                        "order_ids": json.dumps(created_order_ids) # Pass list of IDs
+                        "user_id": str(user_id),
+                        "order_ids": json.dumps(order_ids) # Pass list of IDs
                     }
                 },
                  "product_options": {
@@ -116,16 +106,76 @@ def create_checkout_session():
         }
     }
 
-    headers = {
-        "Accept": "application/vnd.api+json",
-        "Content-Type": "application/vnd.api+json",
-        "Authorization": f"Bearer {api_key}"
-    }
+@api_bp.route('/checkout', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_checkout_session():
+    """Create a Lemon Squeezy checkout session.
+
+    In async mode (CHECKOUT_ASYNC, or ?async=1) the orders are committed
+    together with a checkout intent and the provider call runs in the
+    background: the response is 202 with the intent id, and the client polls
+    GET /checkout/intents/<id> for the checkout_url.
+    """
+    principal = current_principal()
+    current_user_id = principal.id
+
+    cart_id, lines = _cart_lines(current_user_id)
+    if not lines:
+        return jsonify({"message": "Cart is empty"}), 400
+
+    store_id = os.getenv('LEMONSQUEEZY_STORE_ID')
+    variant_id = os.getenv('LEMONSQUEEZY_VARIANT_ID')
+    api_key = lemonsqueezy.api_key
+
+    if not all([store_id, variant_id, api_key]):
+        return jsonify({"message": "Server misconfiguration: Lemon Squeezy keys missing"}), 500
+
+    print(f"DEBUG: creating checkout for user {principal.id}, cart {cart_id}")
+
+    error = _validate_cart_lines(principal.id, lines)
+    if error:
+        return error
+
+    # Calculate total and Create Unpaid Orders
+    total_amount = sum(line.price * line.quantity for line in lines)
+    description = [f"{line.quantity}x {line.name}" for line in lines]
+
+    try:
+        created_order_ids = _insert_orders([{
+            'user_id': principal.id,
+            'product_id': line.product_id,
+            'customer_email': principal.email,
+            'amount_paid': line.price * line.quantity,
+            'status': 'unpaid',
+            'tappay_trade_id': "PENDING_LEMON"
+        } for line in lines])
+
+        # Clear Cart
+        CartItem.query.filter_by(cart_id=cart_id).delete(synchronize_session=False)
+
+        payload = _checkout_payload(principal.id, created_order_ids, total_amount, description)
+        intent = None
+        if current_app.config.get('CHECKOUT_ASYNC') or request.args.get('async') == '1':
+            intent = checkout_intents.create_intent(principal.id, created_order_ids, payload)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"Failed to create order records: {str(e)}"}), 500
+
+    if intent is not None:
+        checkout_intents.enqueue(intent.id)
+        return jsonify({
+            "intent_id": intent.id,
+            "status": intent.status,
+            "order_ids": created_order_ids
+        }), 202
 
     print(f"DEBUG: sending payload to Lemon Squeezy: {payload}")
 
     try:
-        response = requests.post(f"{LEMONSQUEEZY_API_URL}/checkouts", json=payload, headers=headers)
+        response = lemonsqueezy.create_checkout(payload)
         if not response.ok:
             print(f"Lemon Squeezy API Error: Status {response.status_code}")
             print(f"Response Body: {response.text}")
@@ -135,11 +185,36 @@ def create_checkout_session():
         print(f"DEBUG: checkout created successfully: {checkout_data['data']['id']}")
         checkout_url = checkout_data['data']['attributes']['url']
         return jsonify({"checkout_url": checkout_url})
+    except requests.exceptions.Timeout as e:
+        current_app.logger.warning("Lemon Squeezy timeout: %s", e)
+        return jsonify({"message": "Payment provider timed out, please try again"}), 504
     except requests.exceptions.RequestException as e:
         print(f"Lemon Squeezy Connection Error: {str(e)}")
         return jsonify({"message": f"Failed to create checkout session: {str(e)}"}), 500
 
 
+@api_bp.route('/checkout/intents/<int:intent_id>', methods=['GET'])
+@jwt_required()
+def get_checkout_intent(intent_id):
+    """Poll an async checkout: pending/processing until checkout_url is ready, or failed"""
+    intent = CheckoutIntent.query.get(intent_id)
+    if not intent or intent.user_id != current_principal().id:
+        return jsonify({"message": "Checkout intent not found"}), 404
+
+    data = {
+        "intent_id": intent.id,
+        "status": intent.status,
+        "order_ids": json.loads(intent.order_ids),
+        "checkout_url": intent.checkout_url
+    }
+    if intent.status == 'failed':
+        data["message"] = "Could not create the checkout session; you can pay for these orders from My Orders."
+    response = jsonify(data)
+    if intent.status in ('pending', 'processing'):
+        response.headers['Retry-After'] = '1'
+    return response
+
+
 @api_bp.route('/checkout/test', methods=['POST'])
 @jwt_required()
 def test_checkout():
@@ -149,53 +224,40 @@ def test_checkout():
     if flask_env != 'development':
         return jsonify({"message": "Test checkout is only available in development mode"}), 403
     
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    principal = current_principal()
+    current_user_id = principal.id
     
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
-    if not cart or not cart.items:
+    cart_id, lines = _cart_lines(current_user_id)
+    if not lines:
         return jsonify({"message": "Cart is empty"}), 400
     
-    print(f"TEST CHECKOUT: Processing for user {user.id}, cart {cart.id}")
+    print(f"TEST CHECKOUT: Processing for user {principal.id}, cart {cart_id}")
     
-    created_order_ids = []
+    error = _validate_cart_lines(principal.id, lines)
+    if error:
+        return error
     
     try:
-        for item in cart.items:
-            # 1. Quantity Check
-            if item.quantity > 1:
-                return jsonify({"message": "One product is only able to buy and own one for an account.", "code": "quantity_limit"}), 400
-            
-            # 2. Ownership Check
-            existing_order = Order.query.filter_by(user_id=user.id, product_id=item.product_id, status='paid').first()
-            if existing_order:
-                return jsonify({"message": "You already own this product.", "code": "already_owned"}), 400
-            
-            product = Product.query.get(item.product_id)
-            if product:
-                # Create Order and mark as PAID immediately
-                new_order = Order(
-                    user_id=user.id,
-                    product_id=item.product_id,
-                    customer_email=user.email,
-                    amount_paid=product.price * item.quantity,
-                    status='paid',  # Directly set to paid for testing
-                    tappay_trade_id="TEST_CHECKOUT",
-                    lemon_squeezy_order_id=f"test_{user.id}_{item.product_id}_{int(datetime.utcnow().timestamp())}"
-                )
-                db.session.add(new_order)
-                db.session.flush()
-                created_order_ids.append(new_order.id)
-                print(f"TEST CHECKOUT: Created paid order {new_order.id} for product {product.name}")
+        # Create Orders and mark them as PAID immediately
+        timestamp = int(datetime.utcnow().timestamp())
+        created_order_ids = _insert_orders([{
+            'user_id': principal.id,
+            'product_id': line.product_id,
+            'customer_email': principal.email,
+            'amount_paid': line.price * line.quantity,
+            'status': 'paid',  # Directly set to paid for testing
+            'tappay_trade_id': "TEST_CHECKOUT",
+            'lemon_squeezy_order_id': f"test_{principal.id}_{line.product_id}_{timestamp}"
+        } for line in lines])
         
+        entitlements.grant((principal.id, line.product_id) for line in lines)
+        sales_rollups.record_paid(created_order_ids)
+
         # Clear Cart
-        for item in cart.items:
-            db.session.delete(item)
+        CartItem.query.filter_by(cart_id=cart_id).delete(synchronize_session=False)
         
         db.session.commit()
+        entitlements.forget(principal.id)
         print(f"TEST CHECKOUT: Successfully created {len(created_order_ids)} paid orders and cleared cart")
         
         return jsonify({
@@ -229,85 +291,37 @@ def handle_webhook():
     if not hmac.compare_digest(digest, signature):
         return jsonify({"message": "Invalid signature"}), 401
 
-    event = request.get_json()
-    event_name = event.get('meta', {}).get('event_name')
-    data = event.get('data', {})
-    attributes = data.get('attributes', {})
-    
-    # Handle 'order_created'
-    if event_name == 'order_created':
-        meta = event.get('meta', {})
-        custom_data = meta.get('custom_data', {})
-        
-        # New Flow: Check for order_ids
-        order_ids_str = custom_data.get('order_ids')
-        
-        if order_ids_str:
-            try:
-                order_ids = json.loads(order_ids_str)
-                print(f"DEBUG: Processing webhook for orders: {order_ids}")
-                
-                orders = Order.query.filter(Order.id.in_(order_ids)).all()
-                for order in orders:
-                    order.status = 'paid'
-                    order.lemon_squeezy_order_id = str(data.get('id'))
-                    order.tappay_trade_id = "LEMON_SQUEEZY"
-                
-                db.session.commit()
-                print(f"Updated {len(orders)} orders to PAID")
-                return jsonify({"received": True})
-            except Exception as e:
-                 print(f"Error processing webhook order update: {str(e)}")
-                 return jsonify({"message": "Error processing order"}), 500
-
-        # Fallback to Old Flow (if needed for backward compact, though cleaning cart is issue now if we removed it)
-        # Assuming we only care about new flow going forward.
-        # But if old checkout exists, it has user_id/cart_id.
-        user_id = custom_data.get('user_id')
-        cart_id = custom_data.get('cart_id')
-        
-        if user_id and cart_id:
-             # This path is legacy race-condition path, keep as fallback?
-             # User said "directly create an order... put its state unpaid"
-             # So we strongly prefer the new path. 
-             # I will keep the legacy path logic BUT it might fail if cart already cleared. 
-             # Actually, if cart wasn't cleared in legacy, it works.
-             pass 
+    event = request.get_json(silent=True)
+    if not isinstance(event, dict):
+        return jsonify({"message": "Invalid payload"}), 400
 
+    # Acknowledge right away; orders are updated by the webhook worker.
+    # Provider retries of an event already recorded are dropped here.
+    if webhooks.record(request.data, event):
+        webhooks.enqueue()
     return jsonify({"received": True})
 
 @api_bp.route('/orders/<int:order_id>/pay', methods=['POST'])
 @jwt_required()
+@idempotent
 def pay_order(order_id):
     """Create checkout for specific unpaid order"""
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
     order = Order.query.get_or_404(order_id)
     
-    if order.customer_email != User.query.get(current_user_id).email: # Simplistic check, ideally use user_id on Order
+    if not _placed_by(order, principal):
          return jsonify({"message": "Unauthorized"}), 403
          
     if order.status == 'paid':
         return jsonify({"message": "Order already paid"}), 400
     
     # Check if they already own it via another order
-    # Note: order.user_id might be None for old orders, but for new ones it is set.
-    # If order.user_id is set, use it. If not, fallback to email check? 
-    # Current plan: prefer user_id check if available.
-    check_user_id = order.user_id if order.user_id else current_user_id
-    
-    existing_paid = Order.query.filter(
-        Order.user_id == check_user_id,
-        Order.product_id == order.product_id,
-        Order.status == 'paid'
-    ).first()
-    
-    if existing_paid:
+    if entitlements.owns(principal.id, order.product_id):
          return jsonify({"message": "You already own this product.", "code": "already_owned"}), 400
         
     # Create single item checkout
     store_id = os.getenv('LEMONSQUEEZY_STORE_ID')
     variant_id = os.getenv('LEMONSQUEEZY_VARIANT_ID')
-    api_key = os.getenv('LEMONSQUEEZY_API_KEY')
     
     product = order.product
     total_price_cents = int(order.amount_paid * 100)
@@ -337,14 +351,8 @@ def pay_order(order_id):
         }
     }
     
-    headers = {
-        "Accept": "application/vnd.api+json",
-        "Content-Type": "application/vnd.api+json",
-        "Authorization": f"Bearer {api_key}"
-    }
-    
     try:
-        response = requests.post(f"{LEMONSQUEEZY_API_URL}/checkouts", json=payload, headers=headers)
+        response = lemonsqueezy.create_checkout(payload)
         if not response.ok:
              return jsonify({"message": "Provider Error"}), 500
         return jsonify({"checkout_url": response.json()['data']['attributes']['url']})
@@ -354,12 +362,10 @@ def pay_order(order_id):
 @api_bp.route('/orders/<int:order_id>/cancel', methods=['POST'])
 @jwt_required()
 def cancel_order(order_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    principal = current_principal()
     order = Order.query.get_or_404(order_id)
     
-    # Verify ownership (Order only has email currently, tricky... assumes email matches)
-    if order.customer_email != user.email:
+    if not _placed_by(order, principal):
          return jsonify({"message": "Unauthorized"}), 403
          
     if order.status == 'paid':
@@ -1,124 +1,178 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import api_bp
-from extensions import db
-from models import Product, ProductFile, User, Order
+from extensions import db, cache
+from models import Product, ProductFile, Store
+from principal import current_principal
+from services import entitlements
 from services.storage import StorageService
+from services import uploads
+from serializers import PRODUCT_FIELDS, FieldsError, parse_fields, product_load_options, serialize_product
+from pagination import PaginationError, keyset_paginate, parse_limit
+from services.search import search_products
+from services.conditional import conditional
+from datetime import datetime
 import uuid
 
 storage_service = StorageService()
 
+# Keyset orderings for the public catalog; each ends with the primary key so
+# the order is total and cursors stay stable when sort values tie.
+PRODUCT_SORT_ORDERS = {
+    'newest': [(Product.created_at, True), (Product.id, True)],
+    'price_low': [(Product.price, False), (Product.id, False)],
+    'price_high': [(Product.price, True), (Product.id, True)],
+}
+
+def product_cache_tags(product):
+    """Cache tags of every public response that embeds this product"""
+    tags = ['catalog', f'product:{product.id}']
+    if product.user and product.user.store:
+        tags.append(f'store-products:{product.user.store.id}')
+    return tags
+
+def _catalog_version():
+    """Validator for product listings: the `catalog` cache tag is invalidated by
+    every product write and store rename, so reading its version costs no query.
+    No Last-Modified: deletes leave no timestamp behind to compare against."""
+    version = cache.version('catalog')
+    if version is None:
+        return None
+    return version, None
+
+def _product_version(product_id):
+    row = db.session.query(Product.updated_at, Store.updated_at).outerjoin(
+        Store, Store.user_id == Product.user_id
+    ).filter(Product.id == product_id).first()
+    if row is None:
+        return None
+    return list(row), max(filter(None, row), default=None)
+
 @api_bp.route('/products', methods=['GET'])
+@cache.cached(['catalog'])
+@conditional(_catalog_version)
 def get_products():
-    """Get products with optional sorting and searching"""
-    sort_by = request.args.get('sort', 'newest')
+    """Get a page of products with optional sorting and searching.
+
+    With `search`, results default to relevance order (sort=relevance);
+    the other sort modes still apply to the matching set. `fields` selects
+    a sparse fieldset, e.g. fields=id,name,price,image_url.
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
+
     search_query = request.args.get('search', '').strip()
+    sort_by = request.args.get('sort', 'relevance' if search_query else 'newest')
+    order = PRODUCT_SORT_ORDERS.get(sort_by, PRODUCT_SORT_ORDERS['newest'])
+    row_values = None
 
     query = Product.query.filter_by(is_active=True)
 
     # Search
     if search_query:
-        query = query.filter(Product.name.ilike(f'%{search_query}%'))
-
-    # Sort
-    if sort_by == 'price_low':
-        query = query.order_by(Product.price.asc())
-    elif sort_by == 'price_high':
-        query = query.order_by(Product.price.desc())
-    else:  # newest or default
-        query = query.order_by(Product.created_at.desc())
-    
-    products = query.all()
-    
-    return jsonify([{
-        'id': p.id,
-        'name': p.name,
-        'description': p.description,
-        'price': p.price,
-        'user_id': p.user_id,
-        'image_url': p.image_url,
-        'is_active': p.is_active,
-        'created_at': p.created_at.isoformat() if p.created_at else None,
-        'updated_at': p.updated_at.isoformat() if p.updated_at else None,
-        'store_name': p.user.store.name if p.user and p.user.store else 'Unknown Store',
-        'store_id': p.user.store.id if p.user and p.user.store else None,
-        'files': [{
-            'id': f.id,
-            'filename': f.filename,
-            'file_size': f.file_size,
-            'content_type': f.content_type
-        } for f in p.files]
-    } for p in products])
+        query, rank = search_products(query, search_query)
+        if sort_by == 'relevance':
+            rank = rank.label('search_rank')
+            query = query.add_columns(rank)
+            order = [(rank, True), (Product.id, True)]
+            row_values = lambda row: [row.search_rank, row.Product.id]
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        rows, next_cursor = keyset_paginate(
+            query.options(*product_load_options(fields)),
+            order,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            row_values=row_values
+        )
+    except PaginationError as e:
+        return jsonify({"message": str(e)}), 400
+
+    products = [row.Product for row in rows] if row_values else rows
+    
+    return jsonify({
+        'items': [serialize_product(p, fields) for p in products],
+        'next_cursor': next_cursor
+    })
 
 @api_bp.route('/products/my', methods=['GET'])
 @jwt_required()
 def get_my_products():
     """Get all products for the current authenticated seller"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    principal = current_principal()
     
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-    
-    if user.role not in ['seller', 'admin']:
+    if not principal.is_seller:
         return jsonify({"message": "Only sellers can view their products"}), 403
+
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
     
-    products = Product.query.filter_by(user_id=current_user_id).all()
-    return jsonify([{
-        'id': p.id,
-        'name': p.name,
-        'description': p.description,
-        'price': p.price,
-        'user_id': p.user_id,
-        'image_url': p.image_url,
-        'is_active': p.is_active,
-        'created_at': p.created_at.isoformat() if p.created_at else None,
-        'updated_at': p.updated_at.isoformat() if p.updated_at else None,
-        'store_name': p.user.store.name if p.user and p.user.store else 'Unknown Store',
-        'store_id': p.user.store.id if p.user and p.user.store else None,
-        'files': [{
-            'id': f.id,
-            'filename': f.filename,
-            'file_size': f.file_size,
-            'content_type': f.content_type
-        } for f in p.files]
-    } for p in products])
+    products = Product.query.filter_by(user_id=principal.id).options(*product_load_options(fields)).all()
+    return jsonify([serialize_product(p, fields) for p in products])
 
 @api_bp.route('/products/<int:product_id>', methods=['GET'])
+@cache.cached(lambda product_id: [f'product:{product_id}'])
+@conditional(_product_version)
 def get_product(product_id):
     """Get a specific product"""
-    product = Product.query.get(product_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
+
+    product = Product.query.options(*product_load_options(fields)).filter_by(id=product_id).first()
     if not product:
         return jsonify({"message": "Product not found"}), 404
     
+    return jsonify(serialize_product(product, fields))
+
+# Upper bound on ids per batch request, keeps the IN list and response bounded
+BATCH_MAX_IDS = 200
+
+@api_bp.route('/products/batch', methods=['GET'])
+def get_products_batch():
+    """Get many products by id in one call: /products/batch?ids=3,1,2
+
+    Products are returned in request order (duplicates collapsed); ids that
+    do not exist are listed under `missing`.
+    """
+    raw_ids = [part.strip() for part in request.args.get('ids', '').split(',') if part.strip()]
+    if not raw_ids:
+        return jsonify({"message": "ids is required"}), 400
+
+    try:
+        product_ids = list(dict.fromkeys(int(part) for part in raw_ids))
+    except ValueError:
+        return jsonify({"message": "ids must be a comma-separated list of integers"}), 400
+
+    if len(product_ids) > BATCH_MAX_IDS:
+        return jsonify({"message": f"At most {BATCH_MAX_IDS} ids per request"}), 400
+
+    try:
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
+
+    products = Product.query.options(*product_load_options(fields)).filter(Product.id.in_(product_ids)).all()
+    by_id = {p.id: p for p in products}
+
     return jsonify({
-        'id': product.id,
-        'name': product.name,
-        'description': product.description,
-        'price': product.price,
-        'user_id': product.user_id,
-        'image_url': product.image_url,
-        'is_active': product.is_active,
-        'created_at': product.created_at.isoformat() if product.created_at else None,
-        'updated_at': product.updated_at.isoformat() if product.updated_at else None,
-        'store_name': product.user.store.name if product.user and product.user.store else 'Unknown Store',
-        'store_id': product.user.store.id if product.user and product.user.store else None,
-        'files': [{
-            'id': f.id,
-            'filename': f.filename,
-            'file_size': f.file_size,
-            'content_type': f.content_type
-        } for f in product.files]
+        'items': [serialize_product(by_id[pid], fields) for pid in product_ids if pid in by_id],
+        'missing': [pid for pid in product_ids if pid not in by_id]
     })
 
 @api_bp.route('/products', methods=['POST'])
 @jwt_required()
 def create_product():
     """Create a new product"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    principal = current_principal()
     
-    if not user or user.role not in ['seller', 'admin']:
+    if not principal.is_seller:
         return jsonify({"message": "Only sellers can create products"}), 403
     
     data = request.get_json()
@@ -137,7 +191,7 @@ def create_product():
         return jsonify({"message": "Invalid price"}), 400
     
     product = Product(
-        user_id=current_user_id,
+        user_id=principal.id,
         name=name,
         description=description,
         price=price
@@ -145,6 +199,7 @@ def create_product():
     
     db.session.add(product)
     db.session.commit()
+    cache.invalidate(*product_cache_tags(product))
     
     return jsonify({
         "message": "Product created successfully",
@@ -173,8 +228,10 @@ def delete_product(product_id):
             storage_service.delete_file(object_name, storage_service.private_bucket)
         
         # Delete product from database (cascade will delete ProductFile records)
+        cache_tags = product_cache_tags(product)
         db.session.delete(product)
         db.session.commit()
+        cache.invalidate(*cache_tags)
         
         return jsonify({"message": "Product deleted successfully"}), 200
     except Exception as e:
@@ -220,6 +277,7 @@ def update_product(product_id):
     
     try:
         db.session.commit()
+        cache.invalidate(*product_cache_tags(product))
         return jsonify({
             "message": "Product updated successfully",
             "product": {
@@ -257,9 +315,8 @@ def upload_product_image(product_id):
         return jsonify({"message": "No selected file"}), 400
     
     # Validate image type
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     if '.' not in image.filename or \
-       image.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
+       image.filename.rsplit('.', 1)[1].lower() not in storage_service.IMAGE_EXTENSIONS:
         return jsonify({"message": "Invalid file type. Allowed: png, jpg, jpeg, gif, webp"}), 400
     
     # Check file size (max 5MB for images)
@@ -267,9 +324,9 @@ def upload_product_image(product_id):
     file_size = image.tell()
     image.seek(0)  # Reset to beginning
     
-    max_size = 5 * 1024 * 1024  # 5MB
-    if file_size > max_size:
-        return jsonify({"message": "Image size exceeds maximum of 5MB"}), 400
+    if file_size > storage_service.MAX_PRODUCT_IMAGE_SIZE:
+        max_mb = storage_service.MAX_PRODUCT_IMAGE_SIZE / (1024 * 1024)
+        return jsonify({"message": f"Image size exceeds maximum of {max_mb}MB"}), 400
     
     try:
         # Delete old image if exists
@@ -296,6 +353,7 @@ def upload_product_image(product_id):
             # Update product image_url
             product.image_url = full_url
             db.session.commit()
+            cache.invalidate(*product_cache_tags(product))
             
             return jsonify({
                 "message": "Image uploaded successfully",
@@ -307,6 +365,74 @@ def upload_product_image(product_id):
         db.session.rollback()
         return jsonify({"message": "Failed to upload image", "error": str(e)}), 500
 
+def _own_product(product_id):
+    """Return (product, None), or (None, error response) unless the caller owns it"""
+    product = Product.query.get(product_id)
+    if not product:
+        return None, (jsonify({"message": "Product not found"}), 404)
+    if product.user_id != current_principal().id:
+        return None, (jsonify({"message": "Unauthorized"}), 403)
+    return product, None
+
+@api_bp.route('/products/<int:product_id>/image/upload-intent', methods=['POST'])
+@jwt_required()
+def create_product_image_upload(product_id):
+    """Get a presigned POST for uploading a product image straight to storage.
+
+    Body: {filename, content_type, size}. Send the file to upload_url with
+    `fields`, then POST the upload_token to .../image/complete.
+    """
+    product, error = _own_product(product_id)
+    if error:
+        return error
+
+    try:
+        intent = uploads.create_intent(
+            storage_service, 'product_image', product.id, product.user_id, request.get_json(silent=True) or {}
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+    if intent is None:
+        return jsonify({"message": "Failed to create upload"}), 500
+    return jsonify(intent), 200
+
+@api_bp.route('/products/<int:product_id>/image/complete', methods=['POST'])
+@jwt_required()
+def complete_product_image_upload(product_id):
+    """Set a directly uploaded image as the product image"""
+    product, error = _own_product(product_id)
+    if error:
+        return error
+
+    try:
+        uploaded = uploads.complete(
+            storage_service, 'product_image', product.id, product.user_id,
+            (request.get_json(silent=True) or {}).get('upload_token')
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+
+    full_url = storage_service.get_public_url(uploaded['object_name'])
+    if product.image_url and product.image_url != full_url:
+        old_object_name = product.image_url.split(f"{storage_service.public_bucket}/")[-1]
+        # A late completion of an upload older than the current image must
+        # not replace (and delete) the newer one
+        current = storage_service.head_object(old_object_name, storage_service.public_bucket)
+        if current and current.get('LastModified') and uploaded['uploaded_at'] \
+                and current['LastModified'] > uploaded['uploaded_at']:
+            storage_service.delete_file(uploaded['object_name'], storage_service.public_bucket)
+            return jsonify({"message": "A newer image has already been set"}), 409
+        storage_service.delete_file(old_object_name, storage_service.public_bucket)
+
+    product.image_url = full_url
+    db.session.commit()
+    cache.invalidate(*product_cache_tags(product))
+
+    return jsonify({
+        "message": "Image uploaded successfully",
+        "image_url": full_url
+    }), 200
+
 @api_bp.route('/products/<int:product_id>/image', methods=['DELETE'])
 @jwt_required()
 def delete_product_image(product_id):
@@ -331,6 +457,7 @@ def delete_product_image(product_id):
         # Update product
         product.image_url = None
         db.session.commit()
+        cache.invalidate(*product_cache_tags(product))
         
         return jsonify({"message": "Image deleted successfully"}), 200
     except Exception as e:
@@ -353,6 +480,7 @@ def toggle_product_status(product_id):
     try:
         product.is_active = not product.is_active
         db.session.commit()
+        cache.invalidate(*product_cache_tags(product))
         
         return jsonify({
             "message": f"Product {'published' if product.is_active else 'unpublished'} successfully",
@@ -419,7 +547,9 @@ def upload_product_file(product_id):
         )
         
         db.session.add(product_file)
+        product.updated_at = datetime.utcnow()
         db.session.commit()
+        cache.invalidate(*product_cache_tags(product))
         
         return jsonify({
             "message": "File uploaded successfully",
@@ -433,6 +563,71 @@ def upload_product_file(product_id):
     else:
         return jsonify({"message": "Failed to upload file"}), 500
 
+@api_bp.route('/products/<int:product_id>/files/upload-intent', methods=['POST'])
+@jwt_required()
+def create_product_file_upload(product_id):
+    """Get a presigned POST for uploading a product file straight to storage.
+
+    Body: {filename, content_type, size}. Send the file to upload_url with
+    `fields`, then POST the upload_token to .../files/complete. The file
+    never passes through the API worker.
+    """
+    product, error = _own_product(product_id)
+    if error:
+        return error
+
+    try:
+        intent = uploads.create_intent(
+            storage_service, 'product_file', product.id, product.user_id, request.get_json(silent=True) or {}
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+    if intent is None:
+        return jsonify({"message": "Failed to create upload"}), 500
+    return jsonify(intent), 200
+
+@api_bp.route('/products/<int:product_id>/files/complete', methods=['POST'])
+@jwt_required()
+def complete_product_file_upload(product_id):
+    """Verify a directly uploaded file and add it to the product"""
+    product, error = _own_product(product_id)
+    if error:
+        return error
+
+    try:
+        uploaded = uploads.complete(
+            storage_service, 'product_file', product.id, product.user_id,
+            (request.get_json(silent=True) or {}).get('upload_token')
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+
+    full_url = storage_service.get_private_url(uploaded['object_name'])
+    # Completing the same upload twice returns the file already recorded
+    product_file = ProductFile.query.filter_by(product_id=product.id, file_url=full_url).first()
+    if product_file is None:
+        product_file = ProductFile(
+            product_id=product.id,
+            file_url=full_url,
+            filename=uploaded['filename'],
+            file_size=uploaded['file_size'],
+            content_type=uploaded['content_type']
+        )
+        db.session.add(product_file)
+        product.updated_at = datetime.utcnow()
+        db.session.commit()
+        cache.invalidate(*product_cache_tags(product))
+
+    return jsonify({
+        "message": "File uploaded successfully",
+        "file": {
+            "id": product_file.id,
+            "filename": product_file.filename,
+            "file_size": product_file.file_size,
+            "content_type": product_file.content_type
+        }
+    }), 200
+
 @api_bp.route('/products/<int:product_id>/files/<int:file_id>', methods=['DELETE'])
 @jwt_required()
 def delete_product_file(product_id, file_id):
@@ -458,7 +653,9 @@ def delete_product_file(product_id, file_id):
     
     # Delete from database
     db.session.delete(product_file)
+    product.updated_at = datetime.utcnow()
     db.session.commit()
+    cache.invalidate(*product_cache_tags(product))
     
     return jsonify({"message": "File deleted successfully"}), 200
 
@@ -466,25 +663,16 @@ def delete_product_file(product_id, file_id):
 @jwt_required()
 def get_product_file_download_url(product_id, file_id):
     """Get a presigned URL to download a product file"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    principal = current_principal()
         
     product = Product.query.get(product_id)
     if not product:
         return jsonify({"message": "Product not found"}), 404
     
-    # Check if the user is the seller or has bought the product
-    is_seller = product.user_id == user.id
-    # Check if a paid order exists for this user and product
-    has_bought = Order.query.filter_by(
-        customer_email=user.email, 
-        product_id=product_id
-    ).first() is not None
+    # Check if the user is the seller or owns the product
+    is_seller = product.user_id == principal.id
     
-    if not is_seller and not has_bought:
+    if not is_seller and not entitlements.owns(principal.id, product_id):
         return jsonify({"message": "Unauthorized"}), 403
 
     product_file = ProductFile.query.get(file_id)
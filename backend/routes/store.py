@@ -1,15 +1,20 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from extensions import db
-from models import Store, User
+from flask_jwt_extended import jwt_required
+from extensions import db, cache
+from models import Store
+from principal import bump_token_version, current_principal, forget_token_version, issue_access_token
+from pagination import PaginationError, keyset_paginate, parse_limit
+from services.conditional import conditional
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from serializers import PRODUCT_COLUMNS, FieldsError, parse_fields, serialize_value
 
 store_bp = Blueprint('store', __name__)
 
 @store_bp.route('/', methods=['POST'])
 @jwt_required()
 def register_store():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_principal().user
 
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -35,10 +40,13 @@ def register_store():
     # Update user role to seller if they are a buyer
     if user.role == 'buyer':
         user.role = 'seller'
+    # Tokens issued so far carry the old role and no store; the caller gets a fresh one below
+    bump_token_version(user)
 
     try:
         db.session.add(new_store)
         db.session.commit()
+        forget_token_version(user.id)
         return jsonify({
             "message": "Store created successfully",
             "store": {
@@ -46,7 +54,8 @@ def register_store():
                 "name": new_store.name,
                 "description": new_store.description
             },
-            "user_role": user.role
+            "user_role": user.role,
+            "access_token": issue_access_token(user)
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -55,73 +64,142 @@ def register_store():
 @store_bp.route('/my', methods=['GET'])
 @jwt_required()
 def get_my_store():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    store = Store.query.filter_by(user_id=current_principal().id).first()
 
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-
-    if not user.store:
+    if not store:
         return jsonify({"message": "Store not found"}), 404
 
     return jsonify({
-        "id": user.store.id,
-        "name": user.store.name,
-        "description": user.store.description,
-        "created_at": user.store.created_at.isoformat()
+        "id": store.id,
+        "name": store.name,
+        "description": store.description,
+        "created_at": store.created_at.isoformat()
     })
 
+def _store_version(store_id):
+    updated_at = db.session.query(Store.updated_at).filter(Store.id == store_id).first()
+    if updated_at is None:
+        return None
+    return [updated_at[0]], updated_at[0]
+
+def _store_products_version(store_id):
+    """Validator for a store's product list: store changes plus the count and
+    newest update time of the store's products"""
+    from models import Product
+
+    row = db.session.query(
+        Store.updated_at, func.count(Product.id), func.max(Product.updated_at)
+    ).outerjoin(Product, Product.user_id == Store.user_id).filter(
+        Store.id == store_id
+    ).group_by(Store.id, Store.updated_at).first()
+    if row is None:
+        return None
+    return list(row), max(filter(None, [row[0], row[2]]), default=None)
+
+STORE_FIELDS = ('id', 'name', 'description', 'user_id', 'created_at')
+STORE_PRODUCT_FIELDS = (
+    'id', 'name', 'description', 'price', 'image_url', 'created_at',
+    'store_name', 'store_id', 'files_count', 'files_size'
+)
+
 @store_bp.route('/<int:store_id>', methods=['GET'])
+@cache.cached(lambda store_id: [f'store:{store_id}'])
+@conditional(_store_version)
 def get_store(store_id):
     """Get public store information"""
-    store = Store.query.get(store_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), STORE_FIELDS) or STORE_FIELDS
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
+
+    store = Store.query.options(
+        load_only(*[getattr(Store, name) for name in fields])
+    ).filter_by(id=store_id).first()
     
     if not store:
         return jsonify({"message": "Store not found"}), 404
     
-    return jsonify({
-        "id": store.id,
-        "name": store.name,
-        "description": store.description,
-        "user_id": store.user_id,
-        "created_at": store.created_at.isoformat()
-    })
+    return jsonify({name: serialize_value(getattr(store, name)) for name in STORE_FIELDS if name in fields})
 
 @store_bp.route('/<int:store_id>/products', methods=['GET'])
+@cache.cached(lambda store_id: [f'store-products:{store_id}'])
+@conditional(_store_products_version)
 def get_store_products(store_id):
-    """Get all active products for a store (public)"""
-    from models import Product
+    """Get a page of active products for a store (public)"""
+    from models import Product, ProductFile
+    from routes.product import PRODUCT_SORT_ORDERS
+
+    try:
+        fields = parse_fields(request.args.get('fields'), STORE_PRODUCT_FIELDS) or STORE_PRODUCT_FIELDS
+    except FieldsError as e:
+        return jsonify({"message": str(e)}), 400
     
     store = Store.query.get(store_id)
     if not store:
         return jsonify({"message": "Store not found"}), 404
     
+    sort_by = request.args.get('sort', 'newest')
+    order = PRODUCT_SORT_ORDERS.get(sort_by, PRODUCT_SORT_ORDERS['newest'])
+
+    columns = {'id', 'created_at', 'price'} | (set(fields) & set(PRODUCT_COLUMNS))
+    entities = [Product]
+
+    # File statistics are aggregated in SQL per product (served by the
+    # product_files.product_id index) instead of loading every file row,
+    # and skipped entirely unless requested
+    if 'files_count' in fields:
+        entities.append(db.session.query(func.count(ProductFile.id)).filter(
+            ProductFile.product_id == Product.id
+        ).correlate(Product).scalar_subquery().label('files_count'))
+    if 'files_size' in fields:
+        entities.append(db.session.query(func.coalesce(func.sum(ProductFile.file_size), 0)).filter(
+            ProductFile.product_id == Product.id
+        ).correlate(Product).scalar_subquery().label('files_size'))
+
+    def product_of(row):
+        # Single-entity queries yield Product objects rather than rows
+        return row.Product if len(entities) > 1 else row
+
     # Only return active products for public view
-    products = Product.query.filter_by(user_id=store.user_id, is_active=True).all()
+    query = db.session.query(*entities).options(
+        load_only(*[getattr(Product, name) for name in sorted(columns)])
+    ).filter_by(user_id=store.user_id, is_active=True)
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        rows, next_cursor = keyset_paginate(
+            query, order, cursor=request.args.get('cursor'), limit=limit,
+            row_values=lambda row: [getattr(product_of(row), column.key) for column, _ in order]
+        )
+    except PaginationError as e:
+        return jsonify({"message": str(e)}), 400
+
+    items = []
+    for row in rows:
+        item = {name: serialize_value(getattr(product_of(row), name)) for name in PRODUCT_COLUMNS if name in fields}
+        if 'store_name' in fields:
+            item['store_name'] = store.name
+        if 'store_id' in fields:
+            item['store_id'] = store.id
+        if 'files_count' in fields:
+            item['files_count'] = row.files_count
+        if 'files_size' in fields:
+            item['files_size'] = row.files_size
+        items.append(item)
     
-    return jsonify([{
-        'id': p.id,
-        'name': p.name,
-        'description': p.description,
-        'price': p.price,
-        'image_url': p.image_url,
-        'created_at': p.created_at.isoformat() if p.created_at else None,
-        'store_name': store.name,
-        'store_id': store.id,
-        'files_count': len(p.files)
-    } for p in products])
+    return jsonify({
+        'items': items,
+        'next_cursor': next_cursor
+    })
 
 @store_bp.route('/my', methods=['PUT'])
 @jwt_required()
 def update_my_store():
     """Update my store information"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    current_user_id = current_principal().id
+    store = Store.query.filter_by(user_id=current_user_id).first()
     
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-    
-    if not user.store:
+    if not store:
         return jsonify({"message": "Store not found"}), 404
     
     data = request.get_json()
@@ -133,21 +211,31 @@ def update_my_store():
             return jsonify({"message": "Store name cannot be empty"}), 400
         if len(name) > 50:
             return jsonify({"message": "Store name must be less than 50 characters"}), 400
-        user.store.name = name.strip()
+        store.name = name.strip()
     
     if description is not None:
         if len(description) > 500:
             return jsonify({"message": "Description must be less than 500 characters"}), 400
-        user.store.description = description.strip()
+        store.description = description.strip()
     
     try:
         db.session.commit()
+
+        # The store name is embedded in every product response of this store
+        from models import Product
+        product_ids = [pid for (pid,) in db.session.query(Product.id).filter_by(user_id=current_user_id)]
+        cache.invalidate(
+            'catalog',
+            f'store:{store.id}',
+            f'store-products:{store.id}',
+            *[f'product:{pid}' for pid in product_ids]
+        )
         return jsonify({
             "message": "Store updated successfully",
             "store": {
-                "id": user.store.id,
-                "name": user.store.name,
-                "description": user.store.description
+                "id": store.id,
+                "name": store.name,
+                "description": store.description
             }
         }), 200
     except Exception as e:
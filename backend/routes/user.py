@@ -1,9 +1,10 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from . import api_bp
 from extensions import db
-from models import User
+from principal import current_principal
 from services.storage import StorageService
+from services import uploads
 import uuid
 
 storage_service = StorageService()
@@ -11,8 +12,7 @@ storage_service = StorageService()
 @api_bp.route('/profile/picture', methods=['POST'])
 @jwt_required()
 def upload_profile_picture():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_principal().user
     
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -66,3 +66,49 @@ def upload_profile_picture():
             return jsonify({"message": "Failed to upload file"}), 500
 
     return jsonify({"message": "Unknown error"}), 500
+
+
+@api_bp.route('/profile/picture/upload-intent', methods=['POST'])
+@jwt_required()
+def create_profile_picture_upload():
+    """Get a presigned POST for uploading a profile picture straight to storage.
+
+    Body: {filename, content_type, size}. Send the file to upload_url with
+    `fields`, then POST the upload_token to /profile/picture/complete.
+    """
+    user_id = current_principal().id
+    try:
+        intent = uploads.create_intent(
+            storage_service, 'profile_picture', user_id, user_id, request.get_json(silent=True) or {}
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+    if intent is None:
+        return jsonify({"message": "Failed to create upload"}), 500
+    return jsonify(intent), 200
+
+
+@api_bp.route('/profile/picture/complete', methods=['POST'])
+@jwt_required()
+def complete_profile_picture_upload():
+    """Set a directly uploaded image as the profile picture"""
+    user = current_principal().user
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    try:
+        uploaded = uploads.complete(
+            storage_service, 'profile_picture', user.id, user.id,
+            (request.get_json(silent=True) or {}).get('upload_token')
+        )
+    except uploads.UploadError as e:
+        return jsonify({"message": str(e)}), 400
+
+    full_url = storage_service.get_public_url(uploaded['object_name'])
+    user.profile_picture = full_url
+    db.session.commit()
+
+    return jsonify({
+        "message": "Profile picture uploaded successfully",
+        "profile_picture_url": full_url
+    }), 200
@@ -0,0 +1,95 @@
+from datetime import datetime
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from models import Product, ProductFile, Store, User
+
+PRODUCT_FIELDS = (
+    'id', 'name', 'description', 'price', 'user_id', 'image_url', 'is_active',
+    'created_at', 'updated_at', 'store_name', 'store_id', 'files'
+)
+# Fields backed by a products column (the rest come from relationships)
+PRODUCT_COLUMNS = (
+    'id', 'name', 'description', 'price', 'user_id', 'image_url', 'is_active',
+    'created_at', 'updated_at'
+)
+# Always loaded: the primary key, the join key to the store, and the keyset sort columns
+_PRODUCT_REQUIRED_COLUMNS = ('id', 'user_id', 'created_at', 'price')
+
+
+class FieldsError(ValueError):
+    """Raised when a client asks for a field the endpoint does not have"""
+
+
+def parse_fields(value, allowed):
+    """Parse a `?fields=a,b,c` sparse fieldset.
+
+    Returns None when the parameter is absent (meaning every field), otherwise
+    the set of requested field names.
+    """
+    if value is None or not value.strip():
+        return None
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise FieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def serialize_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def product_load_options(fields=None):
+    """Loader options that fetch a product's owning store and file metadata up front.
+
+    The store comes in through a JOIN on the product query itself and files are
+    loaded with one extra SELECT ... WHERE product_id IN (...), so serializing any
+    number of products costs a fixed number of queries.
+
+    With a sparse fieldset only the requested columns are selected, and the
+    store join and files query are skipped when none of their fields are asked for.
+    """
+    if fields is None:
+        fields = PRODUCT_FIELDS
+
+    columns = sorted(set(_PRODUCT_REQUIRED_COLUMNS) | (set(fields) & set(PRODUCT_COLUMNS)))
+    options = [load_only(*[getattr(Product, name) for name in columns])]
+
+    if 'store_name' in fields or 'store_id' in fields:
+        options.append(
+            joinedload(Product.user).load_only(User.id)
+            .joinedload(User.store).load_only(Store.id, Store.name)
+        )
+    if 'files' in fields:
+        options.append(selectinload(Product.files).load_only(
+            ProductFile.id, ProductFile.filename, ProductFile.file_size, ProductFile.content_type
+        ))
+    return tuple(options)
+
+
+def serialize_product_file(product_file):
+    return {
+        'id': product_file.id,
+        'filename': product_file.filename,
+        'file_size': product_file.file_size,
+        'content_type': product_file.content_type
+    }
+
+
+def serialize_product(product, fields=None):
+    """Serialize a product loaded with product_load_options(fields)"""
+    if fields is None:
+        fields = PRODUCT_FIELDS
+
+    data = {name: serialize_value(getattr(product, name)) for name in PRODUCT_COLUMNS if name in fields}
+
+    if 'store_name' in fields or 'store_id' in fields:
+        store = product.user.store if product.user else None
+        if 'store_name' in fields:
+            data['store_name'] = store.name if store else 'Unknown Store'
+        if 'store_id' in fields:
+            data['store_id'] = store.id if store else None
+
+    if 'files' in fields:
+        data['files'] = [serialize_product_file(f) for f in product.files]
+
+    return data
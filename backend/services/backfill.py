@@ -0,0 +1,63 @@
+import logging
+import time
+from datetime import datetime
+from sqlalchemy import func, select, update
+from extensions import db
+from models import BackfillCheckpoint, Order, User
+
+logger = logging.getLogger(__name__)
+
+ORDER_USER_IDS = 'orders.user_id'
+
+
+def _checkpoint(name, restart=False):
+    checkpoint = db.session.get(BackfillCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(name=name, last_id=0)
+        db.session.add(checkpoint)
+    elif restart:
+        checkpoint.last_id = 0
+        checkpoint.completed_at = None
+    db.session.commit()
+    return checkpoint
+
+
+def backfill_order_user_ids(batch_size=1000, max_batches=None, pause=0.0, restart=False):
+    """Fill orders.user_id from customer_email, one primary-key range per transaction.
+
+    Progress is saved in backfill_checkpoints with each batch, so an
+    interrupted run resumes where it stopped. Orders placed after the run
+    starts already carry user_id and are not visited. `pause` sleeps between
+    batches to leave room for regular traffic.
+
+    Orders whose email matches no user are left as they are.
+    Returns (orders_updated, done).
+    """
+    checkpoint = _checkpoint(ORDER_USER_IDS, restart)
+    max_id = db.session.query(func.max(Order.id)).scalar() or 0
+    owner_id = select(User.id).where(User.email == Order.customer_email).scalar_subquery()
+
+    updated = batches = 0
+    while checkpoint.last_id < max_id and (max_batches is None or batches < max_batches):
+        upper = min(checkpoint.last_id + batch_size, max_id)
+        updated += db.session.execute(
+            update(Order)
+            .where(
+                Order.id > checkpoint.last_id, Order.id <= upper, Order.user_id.is_(None),
+                Order.customer_email.in_(select(User.email))
+            )
+            .values(user_id=owner_id),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        checkpoint.last_id = upper
+        db.session.commit()
+        batches += 1
+        if pause:
+            time.sleep(pause)
+
+    done = checkpoint.last_id >= max_id
+    if done and checkpoint.completed_at is None:
+        checkpoint.completed_at = datetime.utcnow()
+        db.session.commit()
+    logger.info("Backfilled user_id on %d orders (up to id %d of %d)", updated, checkpoint.last_id, max_id)
+    return updated, done
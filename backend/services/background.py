@@ -0,0 +1,49 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor(app):
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(app.config.get('BACKGROUND_WORKERS', 4)),
+                thread_name_prefix='background'
+            )
+    return _executor
+
+
+def _run(app, fn, args):
+    with app.app_context():
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("Background task %s failed", fn.__name__)
+        finally:
+            db.session.remove()
+
+
+def submit(fn, *args):
+    """Run fn(*args) on the in-process thread pool, inside an app context.
+
+    Work submitted here is lost if the process exits, so every task has a
+    CLI counterpart (see commands.py) that cron uses to pick up leftovers.
+    """
+    app = current_app._get_current_object()
+    _get_executor(app).submit(_run, app, fn, args)
+
+
+def schedule(delay, fn, *args):
+    """Like submit(), after `delay` seconds"""
+    app = current_app._get_current_object()
+    timer = threading.Timer(delay, lambda: _get_executor(app).submit(_run, app, fn, args))
+    timer.daemon = True
+    timer.start()
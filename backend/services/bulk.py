@@ -0,0 +1,56 @@
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+
+_DIALECT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def insert_ignore(model, rows, conflict_columns):
+    """Insert many rows in one statement, skipping rows that hit a unique constraint.
+
+    `conflict_columns` names the unique index the duplicates would violate.
+    Dialects without ON CONFLICT get a plain multi-row INSERT, so callers
+    should still filter out the rows they already know to exist.
+
+    Returns the result; its rowcount is the number of rows inserted.
+    """
+    if not rows:
+        return None
+    # Core table inserts report a rowcount; ORM bulk inserts do not
+    table = model.__table__
+    dialect_insert = _DIALECT_INSERTS.get(db.engine.dialect.name)
+    if dialect_insert is None:
+        return db.session.execute(insert(table), rows)
+    stmt = dialect_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+    return db.session.execute(stmt, rows)
+
+
+def upsert_increment(model, rows, key_columns, increment_columns):
+    """Insert rows, or add their `increment_columns` onto the existing row with the same key.
+
+    Every row must have a distinct key; aggregate duplicates before calling.
+    Dialects without ON CONFLICT fall back to an UPDATE, then an INSERT, per row.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect_insert = _DIALECT_INSERTS.get(db.engine.dialect.name)
+    if dialect_insert is None:
+        for row in rows:
+            updated = db.session.execute(
+                update(table)
+                .where(*[table.c[name] == row[name] for name in key_columns])
+                .values({name: table.c[name] + row[name] for name in increment_columns})
+            ).rowcount
+            if not updated:
+                db.session.execute(insert(table), row)
+        return
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: table.c[name] + stmt.excluded[name] for name in increment_columns}
+    )
+    db.session.execute(stmt, rows)
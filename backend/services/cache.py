@@ -0,0 +1,212 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+
+
+class MemoryBackend:
+    """In-process LRU store with per-entry TTL.
+
+    Each gunicorn worker holds its own copy, so invalidations only reach the
+    worker that performed the write; use a shared backend when running more
+    than one worker with long TTLs.
+    """
+
+    # Counters are private to the process; see ResponseCache.version()
+    shared = False
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Tag versions live outside the LRU so they are never evicted; losing a
+        # version would let entries cached under an old version come back.
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counters(self, keys):
+        with self._lock:
+            # Reading must not create counters: tags come from request paths
+            return [self._counters.get(key, 0) for key in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    """Shared store backed by Redis, for deployments with several workers.
+
+    Requires the optional `redis` package. Eviction is left to Redis, so the
+    server should run with an LRU maxmemory policy (e.g. volatile-lru): entries
+    carry a TTL while tag versions do not, which keeps the versions resident.
+    """
+
+    shared = True
+
+    def __init__(self, url, prefix='miria:cache:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def get_counters(self, keys):
+        if not keys:
+            return []
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+
+class ResponseCache:
+    """Read-through cache for public GET endpoints.
+
+    Responses are keyed by endpoint, view arguments and normalized query
+    arguments. Every entry is also bound to a set of tags (e.g. `product:12`,
+    `catalog`); invalidating a tag bumps its version, which changes the key of
+    every entry that depends on it, so stale entries are never read again and
+    simply age out.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 60
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        self.default_ttl = int(app.config.get('CACHE_DEFAULT_TTL', 60))
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(int(app.config.get('CACHE_MAX_ENTRIES', 1024)))
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+        elif backend in ('none', '', None):
+            self.backend = None
+        else:
+            raise RuntimeError(f"Unknown CACHE_BACKEND: {backend}")
+
+        app.extensions['response_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def _make_key(self, endpoint, view_args, tags):
+        args = sorted((k, v) for k, v in request.args.items(multi=True) if v != '')
+        versions = self.backend.get_counters([f"tag:{tag}" for tag in tags])
+        material = json.dumps([endpoint, sorted(view_args.items()), args, tags, versions], default=str)
+        return f"resp:{endpoint}:{hashlib.sha1(material.encode('utf-8')).hexdigest()}"
+
+    def cached(self, tags, ttl=None):
+        """Cache successful GET responses of a view.
+
+        `tags` is a list of tag names, or a callable that receives the view's
+        keyword arguments and returns that list.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                entry_tags = tags(**kwargs) if callable(tags) else list(tags)
+                key = self._make_key(request.endpoint, kwargs, entry_tags)
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    response = make_response(entry['body'], entry['status'])
+                    response.headers.clear()
+                    response.headers.extend(entry['headers'])
+                    response.headers['X-Cache'] = 'HIT'
+                    # Answer If-None-Match / If-Modified-Since from the stored validators
+                    return response.make_conditional(request)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    self.backend.set(key, {
+                        'body': response.get_data(as_text=True),
+                        'status': response.status_code,
+                        'headers': [(k, v) for k, v in response.headers.items() if k != 'Content-Length']
+                    }, ttl or self.default_ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def get(self, key):
+        """Read a small JSON-serializable value cached with set(); None on a miss"""
+        if not self.enabled:
+            return None
+        return self.backend.get(f"value:{key}")
+
+    def set(self, key, value, ttl=None):
+        if self.enabled:
+            self.backend.set(f"value:{key}", value, ttl or self.default_ttl)
+
+    def delete(self, key):
+        if self.enabled:
+            self.backend.delete(f"value:{key}")
+
+    def version(self, tag):
+        """Current version of a tag, for use as an HTTP validator; None when disabled.
+
+        A process-local backend only counts its own worker's invalidations, so
+        its versions also roll over every default_ttl seconds: a worker that
+        missed a write stops confirming old copies within the same bound its
+        cached responses are stale for.
+        """
+        if not self.enabled:
+            return None
+        version = self.backend.get_counters([f"tag:{tag}"])[0]
+        if self.backend.shared:
+            return version
+        return [version, int(time.time() // self.default_ttl)]
+
+    def invalidate(self, *tags):
+        """Invalidate every cached response bound to any of the given tags"""
+        if not self.enabled:
+            return
+        for tag in set(tags):
+            self.backend.incr(f"tag:{tag}")
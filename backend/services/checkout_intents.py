@@ -0,0 +1,118 @@
+import json
+import logging
+import random
+from datetime import datetime, timedelta
+import requests
+from extensions import db, lemonsqueezy
+from models import CheckoutIntent
+from services import background
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# An intent left in `processing` this long is assumed to belong to a worker that died
+STALE_PROCESSING = timedelta(minutes=5)
+
+
+def create_intent(user_id, order_ids, payload):
+    """Add a pending intent to the session; the caller commits, then calls enqueue()"""
+    intent = CheckoutIntent(
+        user_id=user_id,
+        order_ids=json.dumps(order_ids),
+        payload=json.dumps(payload),
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(intent)
+    return intent
+
+
+def enqueue(intent_id):
+    """Create the provider checkout for an intent on the background executor"""
+    background.submit(_process_and_reschedule, intent_id)
+
+
+def _process_and_reschedule(intent_id):
+    intent = process(intent_id)
+    if intent is not None and intent.status == 'pending' and intent.next_attempt_at:
+        # Retry in this process; `flask checkout retry` picks up whatever a restart drops
+        delay = max(0, (intent.next_attempt_at - datetime.utcnow()).total_seconds())
+        background.schedule(delay, _process_and_reschedule, intent_id)
+
+
+def _claim(intent_id):
+    """Move a pending intent to processing; False if someone else got it first"""
+    claimed = CheckoutIntent.query.filter(
+        CheckoutIntent.id == intent_id, CheckoutIntent.status == 'pending'
+    ).update({
+        CheckoutIntent.status: 'processing',
+        CheckoutIntent.attempts: CheckoutIntent.attempts + 1,
+        CheckoutIntent.updated_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def _retry_delay(attempts):
+    # Up to 2s, 4s, 8s, ... (exponential backoff with full jitter)
+    return timedelta(seconds=random.uniform(0, 2 ** attempts))
+
+
+def process(intent_id):
+    """Call the provider for one intent and record the outcome. Returns the intent."""
+    if not _claim(intent_id):
+        return CheckoutIntent.query.get(intent_id)
+
+    intent = CheckoutIntent.query.get(intent_id)
+    error, retryable = None, True
+    try:
+        response = lemonsqueezy.create_checkout(json.loads(intent.payload))
+        if response.ok:
+            intent.checkout_url = response.json()['data']['attributes']['url']
+        else:
+            error = f"HTTP {response.status_code}: {response.text[:500]}"
+            # Client errors other than rate limiting won't succeed on a retry
+            retryable = response.status_code == 429 or response.status_code >= 500
+    except (KeyError, TypeError, ValueError) as e:
+        # A success response without a checkout URL won't improve on a retry
+        error, retryable = f"Unexpected response: {e!r}", False
+    except requests.exceptions.RequestException as e:
+        error = str(e)
+
+    if error is None:
+        intent.status = 'ready'
+        intent.last_error = None
+        intent.next_attempt_at = None
+    elif retryable and intent.attempts < MAX_ATTEMPTS:
+        intent.status = 'pending'
+        intent.last_error = error
+        intent.next_attempt_at = datetime.utcnow() + _retry_delay(intent.attempts)
+    else:
+        intent.status = 'failed'
+        intent.last_error = error
+        intent.next_attempt_at = None
+        logger.warning("Checkout intent %s failed after %d attempts: %s", intent.id, intent.attempts, error)
+    db.session.commit()
+    return intent
+
+
+def retry_due(limit=100):
+    """Process pending intents whose next attempt is due, and reclaim stale ones.
+
+    Returns the number of intents processed.
+    """
+    now = datetime.utcnow()
+    CheckoutIntent.query.filter(
+        CheckoutIntent.status == 'processing',
+        CheckoutIntent.updated_at < now - STALE_PROCESSING
+    ).update({CheckoutIntent.status: 'pending', CheckoutIntent.next_attempt_at: now}, synchronize_session=False)
+    db.session.commit()
+
+    due_ids = [intent_id for (intent_id,) in db.session.query(CheckoutIntent.id).filter(
+        CheckoutIntent.status == 'pending',
+        CheckoutIntent.next_attempt_at <= now
+    ).order_by(CheckoutIntent.next_attempt_at).limit(limit)]
+    for intent_id in due_ids:
+        process(intent_id)
+    return len(due_ids)
@@ -0,0 +1,48 @@
+import hashlib
+import json
+from functools import wraps
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+
+def conditional(validator):
+    """Answer conditional GETs (If-None-Match / If-Modified-Since) before running a view.
+
+    `validator` receives the view's keyword arguments and returns either None
+    (the resource does not exist; the view handles that) or a tuple
+    (version, last_modified), where `version` is any JSON-serializable value
+    that changes whenever the representation changes. It should be cheap (a
+    timestamp, an aggregate such as max(updated_at), or a cache tag version),
+    since it runs on every request that reaches the view.
+
+    The strong ETag is derived from the endpoint, its arguments and the
+    version, so a matching request gets a 304 without the view ever loading
+    or serializing the resource.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validators = validator(**kwargs)
+            if validators is None:
+                return view(*args, **kwargs)
+
+            version, last_modified = validators
+            query_args = sorted((k, v) for k, v in request.args.items(multi=True) if v != '')
+            material = json.dumps([request.endpoint, sorted(kwargs.items()), query_args, version], default=str)
+            etag = hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            # Let browsers keep the body but revalidate it on every use
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
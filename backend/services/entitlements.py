@@ -0,0 +1,81 @@
+from datetime import datetime
+from extensions import db, cache
+from models import Entitlement
+from services.bulk import insert_ignore
+
+# Grants invalidate the cached set explicitly, but only in the process that
+# applied them; owns() and owned_among() confirm misses against the table, so
+# a copy cached by another worker never lets a product be bought twice.
+ENTITLEMENTS_TTL = 300
+
+
+def _cache_key(user_id):
+    return f"entitlements:{user_id}"
+
+
+def owned_product_ids(user_id):
+    """Return the set of product ids the user owns.
+
+    Loaded with one primary-key range scan and cached per user. The set may
+    lag behind grants made by other processes; use owns() or owned_among()
+    for decisions.
+    """
+    product_ids = cache.get(_cache_key(user_id))
+    if product_ids is None:
+        product_ids = [
+            product_id for (product_id,) in
+            db.session.query(Entitlement.product_id).filter(Entitlement.user_id == user_id)
+        ]
+        cache.set(_cache_key(user_id), product_ids, ENTITLEMENTS_TTL)
+    return set(product_ids)
+
+
+def owns(user_id, product_id):
+    """Whether the user owns the product.
+
+    Entitlements are never revoked, so a hit in the cached set is final; a miss
+    is confirmed against the row by primary key, since the grant may have been
+    applied by another worker or `flask webhooks process` after the set was cached.
+    """
+    product_id = int(product_id)
+    if product_id in owned_product_ids(user_id):
+        return True
+    if db.session.get(Entitlement, (user_id, product_id)) is None:
+        return False
+    forget(user_id)
+    return True
+
+
+def owned_among(user_id, product_ids):
+    """Return the subset of product_ids the user owns, read from the table.
+
+    One primary-key lookup for the whole batch (a cart at checkout), so a
+    purchase applied by another worker is seen immediately.
+    """
+    product_ids = {int(product_id) for product_id in product_ids}
+    if not product_ids:
+        return set()
+    return {
+        product_id for (product_id,) in
+        db.session.query(Entitlement.product_id).filter(
+            Entitlement.user_id == user_id, Entitlement.product_id.in_(product_ids)
+        )
+    }
+
+
+def grant(pairs):
+    """Record (user_id, product_id) ownership; already-owned pairs are skipped.
+
+    Runs in the caller's transaction. Call forget() with the user ids once it
+    has committed.
+    """
+    now = datetime.utcnow()
+    insert_ignore(Entitlement, [
+        {'user_id': user_id, 'product_id': product_id, 'granted_at': now}
+        for user_id, product_id in set(pairs)
+    ], ['user_id', 'product_id'])
+
+
+def forget(*user_ids):
+    for user_id in set(user_ids):
+        cache.delete(_cache_key(user_id))
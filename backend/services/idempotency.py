@@ -0,0 +1,148 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import delete, or_, update
+from extensions import db
+from models import IdempotencyKey
+from principal import current_principal
+from services.bulk import insert_ignore
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# A claim this old belongs to a request whose worker died; let a retry take it over
+STALE_IN_PROGRESS = timedelta(minutes=5)
+
+
+def _request_hash():
+    material = b'\n'.join([request.method.encode(), request.full_path.encode(), request.get_data()])
+    return hashlib.sha256(material).hexdigest()
+
+
+def _claim(user_id, key, request_hash):
+    """Insert an in_progress row for the key; False if one already exists"""
+    now = datetime.utcnow()
+    # Expired keys and abandoned claims can be reused
+    db.session.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            or_(
+                IdempotencyKey.expires_at < now,
+                (IdempotencyKey.status == 'in_progress') & (IdempotencyKey.created_at < now - STALE_IN_PROGRESS)
+            )
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    ttl = timedelta(hours=current_app.config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    result = insert_ignore(IdempotencyKey, [{
+        'user_id': user_id,
+        'key': key,
+        'request_hash': request_hash,
+        'status': 'in_progress',
+        'created_at': now,
+        'expires_at': now + ttl
+    }], ['user_id', 'key'])
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _existing_response(user_id, key, request_hash):
+    record = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    if record is None:
+        # Released between our claim attempt and this read; the client may retry
+        return _in_progress()
+    if record.request_hash != request_hash:
+        return jsonify({
+            "message": f"{HEADER} was already used for a different request",
+            "code": "idempotency_key_reused"
+        }), 422
+    if record.status != 'completed':
+        return _in_progress()
+    response = make_response(record.response_body, record.response_status)
+    response.mimetype = record.response_mimetype
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _in_progress():
+    response = jsonify({
+        "message": "A request with this Idempotency-Key is still being processed",
+        "code": "idempotency_key_in_progress"
+    })
+    response.status_code = 409
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def _release(user_id, key):
+    db.session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+
+
+def idempotent(view):
+    """Make a POST view safe to retry with an Idempotency-Key header.
+
+    The first request with a given key (per user) runs the view and its
+    response is stored for IDEMPOTENCY_KEY_TTL_HOURS. Repeats with the same
+    key and body get the stored response back without running the view;
+    repeats that arrive while the first is still running get a 409, and
+    reusing a key for a different request is a 422. Error responses are
+    stored too, since checkout may already have committed orders before the
+    provider call failed; only an unhandled exception frees the key. Requests
+    without the header behave as before.
+
+    Apply below @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"message": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+        user_id = current_principal().id
+        request_hash = _request_hash()
+        if not _claim(user_id, key, request_hash):
+            return _existing_response(user_id, key, request_hash)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            _release(user_id, key)
+            raise
+
+        db.session.execute(
+            update(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).values(
+                status='completed',
+                response_status=response.status_code,
+                response_body=response.get_data(as_text=True),
+                response_mimetype=response.mimetype
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        return response
+    return wrapper
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired keys in batches; returns the number deleted"""
+    total = 0
+    while True:
+        expired_ids = db.session.query(IdempotencyKey.id).filter(
+            IdempotencyKey.expires_at < datetime.utcnow()
+        ).limit(batch_size).subquery()
+        deleted = db.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired_ids.select())),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
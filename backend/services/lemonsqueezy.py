@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class LatencyMetrics:
+    """Per-operation call counts, errors and latency (ms) of provider calls.
+
+    Keeps the most recent samples per operation so p50/p99 can be read
+    without an external metrics system.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, elapsed_ms, ok, retries=0):
+        with self._lock:
+            stats = self._stats.setdefault(operation, {
+                'count': 0, 'errors': 0, 'retries': 0, 'samples': deque(maxlen=self.window)
+            })
+            stats['count'] += 1
+            stats['retries'] += retries
+            if not ok:
+                stats['errors'] += 1
+            stats['samples'].append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for operation, stats in self._stats.items():
+                samples = sorted(stats['samples'])
+                result[operation] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'p50_ms': round(samples[int(0.5 * (len(samples) - 1))], 2) if samples else None,
+                    'p99_ms': round(samples[int(0.99 * (len(samples) - 1))], 2) if samples else None,
+                    'max_ms': round(samples[-1], 2) if samples else None,
+                }
+            return result
+
+
+class LemonSqueezyClient:
+    """Shared HTTP client for the Lemon Squeezy API.
+
+    One requests.Session per process keeps connections to the provider alive
+    between checkouts. Every call is bounded by a connect and a read timeout
+    so a slow provider cannot hold a worker indefinitely.
+
+    Idempotent calls (GET) are retried on connection errors, timeouts and
+    429/5xx responses with exponential backoff and full jitter. Calls that
+    create something (POST /checkouts) are only retried when the connection
+    could not be established, since the request never reached the provider.
+    """
+
+    def __init__(self, app=None):
+        self.api_url = "https://api.lemonsqueezy.com/v1"
+        self.api_key = None
+        self.timeout = (3.05, 10)
+        self.max_retries = 2
+        self.backoff = 0.25
+        self.session = None
+        self.metrics = LatencyMetrics()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.api_url = app.config.get('LEMONSQUEEZY_API_URL', self.api_url).rstrip('/')
+        self.api_key = app.config.get('LEMONSQUEEZY_API_KEY')
+        self.timeout = (
+            float(app.config.get('LEMONSQUEEZY_CONNECT_TIMEOUT', 3.05)),
+            float(app.config.get('LEMONSQUEEZY_READ_TIMEOUT', 10))
+        )
+        self.max_retries = int(app.config.get('LEMONSQUEEZY_MAX_RETRIES', 2))
+        self.backoff = float(app.config.get('LEMONSQUEEZY_RETRY_BACKOFF', 0.25))
+
+        pool_size = int(app.config.get('LEMONSQUEEZY_POOL_SIZE', 10))
+        self.session = requests.Session()
+        # Retries are handled in request() so they can respect idempotency
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.api+json",
+            "Content-Type": "application/vnd.api+json",
+        })
+
+        app.extensions['lemonsqueezy'] = self
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, path, operation=None, idempotent=None, **kwargs):
+        """Send a request to the API and return the requests.Response.
+
+        Raises requests.exceptions.RequestException when the provider could
+        not be reached within the retry budget.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD', 'OPTIONS')
+        operation = operation or f"{method.upper()} {path}"
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.setdefault("Authorization", f"Bearer {self.api_key}")
+
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            error = response = None
+            try:
+                response = self.session.request(
+                    method, f"{self.api_url}{path}", headers=headers, timeout=self.timeout, **kwargs
+                )
+            except requests.exceptions.ConnectTimeout as e:
+                # Nothing was sent, so even a non-idempotent call is safe to repeat
+                error, retryable = e, True
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error, retryable = e, idempotent
+            else:
+                retryable = idempotent and response.status_code in RETRY_STATUSES
+
+            if not retryable or attempt >= self.max_retries:
+                self._record(operation, started, error is None and response.ok, attempt)
+                if error is not None:
+                    raise error
+                return response
+
+            logger.warning("Lemon Squeezy %s failed (attempt %d), retrying", operation, attempt + 1)
+            if response is not None:
+                response.close()
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+    def _record(self, operation, started, ok, retries):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.metrics.record(operation, elapsed_ms, ok, retries)
+        logger.info("Lemon Squeezy %s took %.0f ms (ok=%s, retries=%d)", operation, elapsed_ms, ok, retries)
+
+    def create_checkout(self, payload):
+        return self.request('POST', '/checkouts', operation='create_checkout', json=payload)
@@ -0,0 +1,89 @@
+import logging
+from collections import defaultdict
+from sqlalchemy import delete, distinct, func, insert, select, text
+from extensions import db
+from models import Order, Product, SalesRollup
+from services.bulk import upsert_increment
+
+logger = logging.getLogger(__name__)
+
+
+def record_paid(order_ids):
+    """Add orders that just became paid to the rollups, in the caller's transaction.
+
+    Call once per order, in the transaction that marks it paid. A buyer
+    counts once per product per day, even when they paid for several
+    orders of it. Revenue and units are exact under concurrency, but
+    `buyers` is not: two workers paying the same buyer's orders of one
+    product and day at once each see the other's order as unpaid and both
+    count the buyer. `flask analytics rebuild` recounts buyers from the
+    orders and corrects this.
+    """
+    if not order_ids:
+        return
+    rows = db.session.query(
+        Order.id, Order.user_id, Order.product_id, Order.amount_paid, Order.created_at, Product.user_id
+    ).join(Product, Product.id == Order.product_id).filter(Order.id.in_(order_ids)).all()
+
+    # (user, product, day) pairs already counted by earlier paid orders
+    buyer_ids = {user_id for _, user_id, _, _, _, _ in rows if user_id}
+    counted = set()
+    if buyer_ids:
+        counted = {
+            (user_id, product_id, created_at.date())
+            for user_id, product_id, created_at in db.session.query(
+                Order.user_id, Order.product_id, Order.created_at
+            ).filter(
+                Order.user_id.in_(buyer_ids),
+                Order.product_id.in_({product_id for _, _, product_id, _, _, _ in rows}),
+                Order.status == 'paid',
+                Order.id.not_in(order_ids)
+            )
+        }
+
+    totals = defaultdict(lambda: {'revenue': 0.0, 'units': 0, 'buyers': 0})
+    for _, user_id, product_id, amount_paid, created_at, seller_id in rows:
+        day = created_at.date()
+        entry = totals[(product_id, day, seller_id)]
+        entry['revenue'] += amount_paid
+        entry['units'] += 1
+        if user_id and (user_id, product_id, day) not in counted:
+            counted.add((user_id, product_id, day))
+            entry['buyers'] += 1
+
+    upsert_increment(SalesRollup, [
+        {'product_id': product_id, 'day': day, 'seller_id': seller_id, **entry}
+        for (product_id, day, seller_id), entry in totals.items()
+    ], ['product_id', 'day'], ['revenue', 'units', 'buyers'])
+
+
+def rebuild(seller_id=None):
+    """Recompute the rollups from paid orders (all sellers, or one) and commit.
+
+    Returns the number of rollup rows written.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        # Hold off webhook increments so none lands between the delete and the
+        # insert; orders paid while waiting for the lock are counted by the insert.
+        db.session.execute(text('LOCK TABLE sales_rollups IN EXCLUSIVE MODE'))
+
+    cleared = delete(SalesRollup)
+    if seller_id is not None:
+        cleared = cleared.where(SalesRollup.seller_id == seller_id)
+    db.session.execute(cleared, execution_options={'synchronize_session': False})
+
+    day = func.date(Order.created_at)
+    paid = select(
+        Order.product_id, day, Product.user_id,
+        func.sum(Order.amount_paid), func.count(Order.id), func.count(distinct(Order.user_id))
+    ).join(Product, Product.id == Order.product_id).where(Order.status == 'paid')
+    if seller_id is not None:
+        paid = paid.where(Product.user_id == seller_id)
+    paid = paid.group_by(Order.product_id, day, Product.user_id)
+
+    written = db.session.execute(insert(SalesRollup.__table__).from_select(
+        ['product_id', 'day', 'seller_id', 'revenue', 'units', 'buyers'], paid
+    )).rowcount
+    db.session.commit()
+    logger.info("Rebuilt %d sales rollup rows", written)
+    return written
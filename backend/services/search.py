@@ -0,0 +1,57 @@
+import re
+from sqlalchemy import Float, case, cast, func, literal_column, or_
+from extensions import db
+from models import Product
+
+# Text search configuration used by the products.search_vector generated column.
+# 'simple' does no stemming, which keeps it language neutral for mixed-language catalogs.
+SEARCH_CONFIG = 'simple'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _prefix_tsquery(term):
+    """Build a to_tsquery() string that prefix-matches every word in the term,
+    so partially typed queries ("pyth") still hit the index."""
+    tokens = _TOKEN_RE.findall(term.lower())
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def search_products(query, term):
+    """Filter a Product query by a search term across name and description.
+
+    Returns (query, rank) where rank is a float expression, higher for better
+    matches, suitable for ordering by relevance.
+
+    On PostgreSQL this uses the GIN-indexed products.search_vector column for
+    full-text matching plus pg_trgm similarity on the name for typos. Other
+    databases (SQLite in local setups) fall back to a case-insensitive
+    substring match that ranks name hits above description hits.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _search_postgresql(query, term)
+    return _search_fallback(query, term)
+
+
+def _search_postgresql(query, term):
+    vector = literal_column('products.search_vector')
+    similarity = func.similarity(Product.name, term)
+    # `%` is pg_trgm's indexed similarity operator (threshold pg_trgm.similarity_threshold)
+    conditions = [Product.name.op('%')(term)]
+    rank = similarity
+
+    tsquery_text = _prefix_tsquery(term)
+    if tsquery_text:
+        tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        conditions.append(vector.op('@@')(tsquery))
+        rank = func.ts_rank_cd(vector, tsquery) + similarity
+
+    return query.filter(or_(*conditions)), cast(rank, Float)
+
+
+def _search_fallback(query, term):
+    needle = term.lower()
+    name_match = func.lower(Product.name).contains(needle, autoescape=True)
+    description_match = func.lower(func.coalesce(Product.description, '')).contains(needle, autoescape=True)
+    rank = case((name_match, 2.0), else_=1.0)
+    return query.filter(or_(name_match, description_match)), cast(rank, Float)
@@ -6,7 +6,10 @@ from flask import current_app
 class StorageService:
     # File size limits in bytes
     MAX_PROFILE_PICTURE_SIZE = 5 * 1024 * 1024  # 5MB
+    MAX_PRODUCT_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
     MAX_PRODUCT_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+    # Accepted product image extensions
+    IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     
     def __init__(self):
         self.endpoint_url = os.environ.get('MINIO_ENDPOINT')
@@ -70,6 +73,42 @@ class StorageService:
             current_app.logger.error(f"Error generating presigned URL: {e}")
             return None
 
+    def generate_presigned_post(self, object_name, bucket_name, content_type, max_size, expiration=900):
+        """Generate a presigned POST (url and form fields) for uploading one object directly.
+
+        The policy pins the key and content type and caps the size, so the
+        storage server rejects any other upload.
+        """
+        if not self.s3_client:
+            return None
+
+        try:
+            return self.s3_client.generate_presigned_post(
+                bucket_name,
+                object_name,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_size]
+                ],
+                ExpiresIn=expiration
+            )
+        except ClientError as e:
+            current_app.logger.error(f"Error generating presigned POST: {e}")
+            return None
+
+    def head_object(self, object_name, bucket_name):
+        """Get a stored object's metadata (ContentLength, ContentType), or None if it is missing"""
+        if not self.s3_client:
+            return None
+
+        try:
+            return self.s3_client.head_object(Bucket=bucket_name, Key=object_name)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                current_app.logger.error(f"Error reading object metadata: {e}")
+            return None
+
     def delete_file(self, object_name, bucket_name):
         """Delete a file from specified bucket"""
         if not self.s3_client:
@@ -0,0 +1,114 @@
+import posixpath
+import uuid
+from flask import current_app
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from services.storage import StorageService
+
+# How long the presigned POST accepts the upload
+UPLOAD_URL_EXPIRATION = 15 * 60
+# How long after the intent the upload may be completed (large files take a while)
+COMPLETE_WITHIN = 60 * 60
+# An object uploaded for an intent that is never completed is referenced by
+# no row and stays in the bucket. Completed objects share its prefix, so a
+# plain lifecycle expiry would take them too; sweep orphans by listing the
+# prefix against product_files.file_url / image_url / profile_picture.
+
+# kind -> (key prefix, bucket attribute on StorageService, max size in bytes)
+UPLOAD_KINDS = {
+    'product_file': ('products', 'private_bucket', StorageService.MAX_PRODUCT_FILE_SIZE),
+    'product_image': ('product_images', 'public_bucket', StorageService.MAX_PRODUCT_IMAGE_SIZE),
+    'profile_picture': ('profile_pictures', 'public_bucket', StorageService.MAX_PROFILE_PICTURE_SIZE),
+}
+
+
+class UploadError(ValueError):
+    """Raised when an upload intent or its completion is rejected"""
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='upload-intent')
+
+
+def _validate(kind, filename, content_type, size):
+    max_size = UPLOAD_KINDS[kind][2]
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise UploadError("size must be a positive number of bytes")
+    if size > max_size:
+        raise UploadError(f"File size exceeds maximum of {max_size / (1024 * 1024)}MB")
+    if kind == 'product_image':
+        if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in StorageService.IMAGE_EXTENSIONS:
+            raise UploadError("Invalid file type. Allowed: png, jpg, jpeg, gif, webp")
+    if kind in ('product_image', 'profile_picture') and not content_type.startswith('image/'):
+        raise UploadError("Only image files are allowed")
+
+
+def create_intent(storage, kind, owner_id, user_id, data):
+    """Validate an upload request and return a presigned POST for it.
+
+    `owner_id` is the product (or user) the object belongs to; the returned
+    upload_token binds the object key to it and to `user_id` for complete().
+    """
+    filename = posixpath.basename(str(data.get('filename') or '').replace('\\', '/'))
+    content_type = str(data.get('content_type') or 'application/octet-stream')
+    if not filename:
+        raise UploadError("filename is required")
+    _validate(kind, filename, content_type, data.get('size'))
+
+    prefix, bucket_attr, max_size = UPLOAD_KINDS[kind]
+    object_name = f"{prefix}/{owner_id}/{uuid.uuid4()}_{filename}"
+    post = storage.generate_presigned_post(
+        object_name, getattr(storage, bucket_attr), content_type, max_size, expiration=UPLOAD_URL_EXPIRATION
+    )
+    if post is None:
+        return None
+
+    token = _serializer().dumps({
+        'kind': kind,
+        'owner': owner_id,
+        'user': user_id,
+        'key': object_name,
+        'filename': filename,
+        'content_type': content_type,
+    })
+    return {
+        'upload_url': post['url'],
+        'fields': post['fields'],
+        'upload_token': token,
+        'expires_in': UPLOAD_URL_EXPIRATION,
+    }
+
+
+def complete(storage, kind, owner_id, user_id, token):
+    """Check an uploaded object against its intent and return its details.
+
+    Returns a dict with object_name, filename, file_size, content_type and
+    uploaded_at (the object's LastModified, when storage reports it). An object that breaks the limits is deleted before UploadError is raised.
+    """
+    try:
+        intent = _serializer().loads(token or '', max_age=COMPLETE_WITHIN)
+    except SignatureExpired:
+        raise UploadError("Upload token expired; start the upload again")
+    except BadSignature:
+        raise UploadError("Invalid upload token")
+    if (intent.get('kind'), intent.get('owner'), intent.get('user')) != (kind, owner_id, user_id):
+        raise UploadError("Invalid upload token")
+
+    _, bucket_attr, max_size = UPLOAD_KINDS[kind]
+    bucket = getattr(storage, bucket_attr)
+    head = storage.head_object(intent['key'], bucket)
+    if head is None:
+        raise UploadError("Uploaded file not found")
+
+    size = head.get('ContentLength', 0)
+    content_type = head.get('ContentType') or intent['content_type']
+    if size <= 0 or size > max_size or content_type != intent['content_type']:
+        storage.delete_file(intent['key'], bucket)
+        raise UploadError("Uploaded file does not match the upload request")
+
+    return {
+        'object_name': intent['key'],
+        'filename': intent['filename'],
+        'file_size': size,
+        'content_type': content_type,
+        'uploaded_at': head.get('LastModified'),
+    }
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import case, update
+from extensions import db
+from models import Order, WebhookEvent
+from services import background, entitlements, sales_rollups
+from services.bulk import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+
+def event_key(raw_body, event):
+    """Deduplication key: event_name:data.id, or a hash of the raw body"""
+    event_name = (event.get('meta') or {}).get('event_name')
+    data_id = (event.get('data') or {}).get('id')
+    if event_name and data_id:
+        return f"{event_name}:{data_id}"[:255]
+    return 'sha256:' + hashlib.sha256(raw_body).hexdigest()
+
+
+def record(raw_body, event):
+    """Store a verified event for processing and commit it.
+
+    Returns False when the event was already recorded (a provider retry).
+    """
+    result = insert_ignore(WebhookEvent, [{
+        'event_key': event_key(raw_body, event),
+        'event_name': (event.get('meta') or {}).get('event_name'),
+        'payload': raw_body.decode('utf-8'),
+        'status': 'pending',
+        'received_at': datetime.utcnow()
+    }], ['event_key'])
+    db.session.commit()
+    return result.rowcount != 0
+
+
+def _paid_orders(payload):
+    """Map order id -> provider order id for an order_created event, or None if it has none"""
+    custom_data = (payload.get('meta') or {}).get('custom_data') or {}
+    order_ids_str = custom_data.get('order_ids')
+    if not order_ids_str:
+        # Legacy cart_id/user_id checkouts carry no order ids
+        return None
+    provider_order_id = str(payload['data']['id'])
+    return {int(order_id): provider_order_id for order_id in json.loads(order_ids_str)}
+
+
+def _mark_orders_paid(paid):
+    """Mark orders paid with one UPDATE; returns (id, user_id, product_id) of the orders changed"""
+    if not paid:
+        return []
+    return db.session.execute(
+        update(Order)
+        .where(Order.id.in_(paid.keys()), Order.status != 'paid')
+        .values(
+            status='paid',
+            tappay_trade_id="LEMON_SQUEEZY",
+            lemon_squeezy_order_id=case(paid, value=Order.id)
+        )
+        .returning(Order.id, Order.user_id, Order.product_id),
+        execution_options={'synchronize_session': False}
+    ).all()
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """Apply up to batch_size pending events in one transaction.
+
+    Orders already paid are left untouched, so replaying an event is a no-op.
+    Returns the number of events handled.
+    """
+    events = WebhookEvent.query.filter_by(status='pending').order_by(
+        WebhookEvent.id
+    ).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not events:
+        db.session.commit()
+        return 0
+
+    paid = {}
+    outcomes = {'processed': [], 'ignored': []}
+    failures = {}
+    for event in events:
+        try:
+            payload = json.loads(event.payload)
+            event_orders = _paid_orders(payload) if event.event_name == 'order_created' else None
+        except (ValueError, KeyError, TypeError) as e:
+            failures[event.id] = f"{type(e).__name__}: {e}"
+            continue
+        if event_orders is None:
+            outcomes['ignored'].append(event.id)
+        else:
+            paid.update(event_orders)
+            outcomes['processed'].append(event.id)
+
+    newly_paid = _mark_orders_paid(paid)
+    owners = [(user_id, product_id) for _, user_id, product_id in newly_paid if user_id]
+    entitlements.grant(owners)
+    sales_rollups.record_paid([order_id for order_id, _, _ in newly_paid])
+
+    now = datetime.utcnow()
+    for status, event_ids in outcomes.items():
+        if event_ids:
+            db.session.execute(
+                update(WebhookEvent).where(WebhookEvent.id.in_(event_ids))
+                .values(status=status, processed_at=now),
+                execution_options={'synchronize_session': False}
+            )
+    for event_id, error in failures.items():
+        logger.warning("Webhook event %s could not be applied: %s", event_id, error)
+        db.session.execute(
+            update(WebhookEvent).where(WebhookEvent.id == event_id)
+            .values(status='failed', last_error=error, processed_at=now),
+            execution_options={'synchronize_session': False}
+        )
+    db.session.commit()
+    entitlements.forget(*[user_id for user_id, _ in owners])
+    logger.info("Applied %d webhook events (%d orders paid)", len(events), len(newly_paid))
+    return len(events)
+
+
+def drain(batch_size=BATCH_SIZE):
+    """Process batches until no pending events are left; returns the number handled"""
+    total = 0
+    while True:
+        handled = process_batch(batch_size)
+        total += handled
+        if handled < batch_size:
+            return total
+
+
+def enqueue():
+    background.submit(drain)
@@ -0,0 +1,127 @@
+import os
+import pytest
+from werkzeug.security import generate_password_hash
+
+# Never point the suite at the database configured in .env
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-with-enough-length')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+from app import create_app
+from extensions import db as _db
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client, db):
+    """Create a user and return Authorization headers for it"""
+    def login(username='buyer', role='buyer'):
+        from models import User
+        db.session.add(User(
+            username=username, email=f'{username}@example.com',
+            password_hash=generate_password_hash('secret'), role=role
+        ))
+        db.session.commit()
+        response = client.post('/api/login', json={'username': username, 'password': 'secret'})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Point the Lemon Squeezy client at a local stub server"""
+    from extensions import lemonsqueezy
+    from tests.lemonsqueezy_stub import LemonSqueezyStub
+    stub = LemonSqueezyStub().start()
+    monkeypatch.setenv('LEMONSQUEEZY_STORE_ID', '1')
+    monkeypatch.setenv('LEMONSQUEEZY_VARIANT_ID', '2')
+    monkeypatch.setattr(lemonsqueezy, 'api_url', stub.url)
+    monkeypatch.setattr(lemonsqueezy, 'api_key', 'test-key')
+    monkeypatch.setattr(lemonsqueezy, 'backoff', 0.01)
+    yield stub
+    stub.stop()
+
+
+def _get_or_create_user(db, username, role):
+    from models import User
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        user = User(username=username, email=f'{username}@example.com', password_hash='x', role=role)
+        db.session.add(user)
+        db.session.flush()
+    return user
+
+
+@pytest.fixture
+def make_product(db):
+    """Create a product and return it.
+
+    `seller` is a username, created on first use. Keyword arguments set
+    Product columns; `files` adds a ProductFile per filename.
+    """
+    def make_product(seller='seller', files=(), **fields):
+        from models import Product, ProductFile
+        seller = _get_or_create_user(db, seller, 'seller')
+        product = Product(user_id=seller.id, **{'name': 'Pack', 'price': 5.0, **fields})
+        db.session.add(product)
+        db.session.flush()
+        db.session.add_all([
+            ProductFile(product_id=product.id, file_url=f'files/{filename}', filename=filename,
+                        file_size=1, content_type='application/zip')
+            for filename in files
+        ])
+        db.session.commit()
+        return product
+    return make_product
+
+
+@pytest.fixture
+def make_order(db, make_product):
+    """Create a paid order and return it.
+
+    The product defaults to a new one from make_product(); `buyer` is a
+    username, created on first use. Keyword arguments set Order columns (pass
+    user_id=None for an order from before orders.user_id).
+    """
+    def make_order(product=None, buyer='buyer', **fields):
+        from models import Order
+        if product is None:
+            product = make_product()
+        buyer = _get_or_create_user(db, buyer, 'buyer')
+        order = Order(product_id=product.id, **{
+            'user_id': buyer.id, 'customer_email': buyer.email, 'amount_paid': product.price, 'status': 'paid',
+            **fields
+        })
+        db.session.add(order)
+        db.session.commit()
+        return order
+    return make_order
+
+
+@pytest.fixture
+def add_product_to_cart(client, make_product):
+    """Create a product and add it to the cart of the given headers"""
+    def add_product_to_cart(headers):
+        product = make_product(name='Brush set', price=8.0)
+        client.post('/api/cart/items', json={'product_id': product.id}, headers=headers)
+    return add_product_to_cart
@@ -0,0 +1,98 @@
+"""A local stand-in for the Lemon Squeezy API, for offline tests and manual runs.
+
+    python tests/lemonsqueezy_stub.py --port 8765
+    LEMONSQUEEZY_API_URL=http://127.0.0.1:8765 flask --app wsgi run
+
+POST /checkouts answers with a checkout URL and GET /checkouts/<id> echoes
+the checkout back. Tests can make it slow (`delay`), fail the next N
+requests with a status code (`fail_next`, `fail_status`) or replace the
+body of successful checkout responses (`checkout_body`).
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/vnd.api+json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'null')
+        stub.requests.append((self.command, self.path, body))
+
+        if stub.delay:
+            time.sleep(stub.delay)
+        with stub.lock:
+            if stub.fail_next > 0:
+                stub.fail_next -= 1
+                return self._send(stub.fail_status, {"errors": [{"detail": "stub failure"}]})
+
+        if self.command == 'POST' and self.path == '/checkouts':
+            if stub.checkout_body is not None:
+                return self._send(201, stub.checkout_body)
+            checkout_id = str(uuid.uuid4())
+            return self._send(201, {"data": {
+                "type": "checkouts", "id": checkout_id,
+                "attributes": {"url": f"https://stub.lemonsqueezy.test/checkout/{checkout_id}"}
+            }})
+        if self.command == 'GET' and self.path.startswith('/checkouts/'):
+            checkout_id = self.path.rsplit('/', 1)[1]
+            return self._send(200, {"data": {"type": "checkouts", "id": checkout_id}})
+        return self._send(404, {"errors": [{"detail": "not found"}]})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class LemonSqueezyStub:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.stub = self
+        self.lock = threading.Lock()
+        self.requests = []
+        self.delay = 0
+        self.fail_next = 0
+        self.fail_status = 503
+        self.checkout_body = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0, help='Seconds to wait before every response')
+    args = parser.parse_args()
+
+    stub = LemonSqueezyStub(args.host, args.port)
+    stub.delay = args.delay
+    print(f"Lemon Squeezy stub listening on {stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,40 @@
+"""Old orders get user_id from customer_email in checkpointed batches."""
+from models import BackfillCheckpoint, Order, User
+from services.backfill import ORDER_USER_IDS, backfill_order_user_ids
+
+
+def make_legacy_orders(make_product, make_order, count):
+    """Orders from before orders.user_id: `count` by the buyer and one by a deleted account"""
+    product = make_product()
+    for _ in range(count):
+        make_order(product, user_id=None)
+    make_order(product, user_id=None, customer_email='gone@example.com')
+    return User.query.filter_by(username='buyer').one().id
+
+
+def test_backfill_resumes_from_checkpoint(db, make_product, make_order):
+    buyer_id = make_legacy_orders(make_product, make_order, 5)
+
+    assert backfill_order_user_ids(batch_size=2, max_batches=2) == (4, False)
+    assert db.session.get(BackfillCheckpoint, ORDER_USER_IDS).last_id == 4
+
+    assert backfill_order_user_ids(batch_size=2) == (1, True)
+    assert db.session.get(BackfillCheckpoint, ORDER_USER_IDS).completed_at is not None
+    user_ids = [user_id for (user_id,) in db.session.query(Order.user_id).order_by(Order.id)]
+    assert user_ids == [buyer_id] * 5 + [None]
+
+
+def test_cli_reports_progress(app, make_product, make_order):
+    make_legacy_orders(make_product, make_order, 3)
+
+    result = app.test_cli_runner().invoke(args=['orders', 'backfill-user-ids', '--batch-size', '2'])
+    assert 'Updated 3 order(s); backfill complete' in result.output
+
+
+def test_unfilled_orders_are_authorized_by_email(client, login, make_order):
+    owner = login('buyer')
+    other = login('other')
+    order = make_order(user_id=None, status='unpaid')
+
+    assert client.post(f'/api/orders/{order.id}/cancel', headers=other).status_code == 403
+    assert client.post(f'/api/orders/{order.id}/cancel', headers=owner).status_code == 200
@@ -0,0 +1,13 @@
+"""Tag versions are only stored once a tag has been invalidated."""
+from services.cache import MemoryBackend
+
+
+def test_reading_counters_does_not_create_them():
+    backend = MemoryBackend(max_entries=1)
+
+    for product_id in range(100):
+        assert backend.get_counters([f'product:{product_id}']) == [0]
+
+    assert backend.incr('catalog') == 1
+    assert backend.get_counters(['product:404', 'catalog']) == [0, 1]
+    assert backend.incr('product:404') == 1
@@ -0,0 +1,95 @@
+"""The cart is read with one joined query; local carts merge into it set-wise."""
+from models import CartItem, Product
+
+
+def test_empty_cart(client, db, login):
+    headers = login()
+
+    data = client.get('/api/cart', headers=headers).get_json()
+    assert data['cart_id'] is None
+    assert data['items'] == []
+    assert data['total_items'] == 0
+    assert data['total_price'] == 0
+
+
+def test_cart_totals(client, db, login, make_product):
+    headers = login()
+    first, second = [make_product(price=price).id for price in (4.25, 10.0)]
+    for product_id in (first, second):
+        client.post('/api/cart/items', json={'product_id': product_id}, headers=headers)
+    item_id = CartItem.query.filter_by(product_id=second).one().id
+    client.put(f'/api/cart/items/{item_id}', json={'quantity': 2}, headers=headers)
+
+    data = client.get('/api/cart', headers=headers).get_json()
+    assert [(item['product_id'], item['quantity'], item['total']) for item in data['items']] == [
+        (first, 1, 4.25), (second, 2, 20.0)
+    ]
+    assert data['total_items'] == 2
+    assert data['total_price'] == 24.25
+
+
+def test_deleted_product_is_left_out(client, db, login, make_product):
+    headers = login()
+    kept, deleted = [make_product(price=price).id for price in (3.0, 7.0)]
+    for product_id in (kept, deleted):
+        client.post('/api/cart/items', json={'product_id': product_id}, headers=headers)
+    Product.query.filter_by(id=deleted).delete()
+    db.session.commit()
+
+    data = client.get('/api/cart', headers=headers).get_json()
+    assert [item['product_id'] for item in data['items']] == [kept]
+    assert data['total_items'] == 1
+    assert data['total_price'] == 3.0
+
+
+def test_inactive_product_stays_in_cart(client, db, login, make_product):
+    headers = login()
+    product_id = make_product(price=5.0).id
+    client.post('/api/cart/items', json={'product_id': product_id}, headers=headers)
+    db.session.get(Product, product_id).is_active = False
+    db.session.commit()
+
+    data = client.get('/api/cart', headers=headers).get_json()
+    assert [item['product_id'] for item in data['items']] == [product_id]
+    assert data['total_price'] == 5.0
+
+
+def test_merge_adds_missing_items(client, db, login, make_product):
+    headers = login()
+    in_cart, new = [make_product(price=price).id for price in (2.0, 6.0)]
+    client.post('/api/cart/items', json={'product_id': in_cart}, headers=headers)
+
+    response = client.post('/api/cart/merge', json={'items': [
+        {'product_id': in_cart, 'quantity': 3},
+        {'product_id': new, 'quantity': 2},
+    ]}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['merged_count'] == 2
+    assert response.get_json()['skipped'] == []
+
+    items = client.get('/api/cart', headers=headers).get_json()['items']
+    assert [(item['product_id'], item['quantity']) for item in items] == [(in_cart, 1), (new, 1)]
+
+
+def test_merge_reports_skipped_items(client, db, login, make_product):
+    headers = login()
+    product_id = make_product(price=2.0).id
+
+    response = client.post('/api/cart/merge', json={'items': [
+        {'product_id': product_id, 'quantity': 1},
+        {'product_id': 'abc', 'quantity': 1},
+        {'product_id': product_id + 1, 'quantity': 0},
+        'not an item',
+        {'product_id': product_id, 'quantity': 1},
+        {'product_id': 999, 'quantity': 1},
+    ]}, headers=headers)
+    data = response.get_json()
+    assert data['merged_count'] == 1
+    assert data['skipped'] == [
+        {'product_id': 'abc', 'reason': 'invalid'},
+        {'product_id': product_id + 1, 'reason': 'invalid'},
+        {'product_id': None, 'reason': 'invalid'},
+        {'product_id': product_id, 'reason': 'duplicate'},
+        {'product_id': 999, 'reason': 'not_found'},
+    ]
+    assert [item.product_id for item in CartItem.query.all()] == [product_id]
@@ -0,0 +1,26 @@
+"""Checkout turns the cart into orders with one bulk insert and empties the cart."""
+from models import Order
+
+
+def fill_cart(client, make_product, headers, *prices):
+    product_ids = [make_product(price=price).id for price in prices]
+    for product_id in product_ids:
+        client.post('/api/cart/items', json={'product_id': product_id}, headers=headers)
+    return product_ids
+
+
+def test_checkout_inserts_one_order_per_item(client, db, login, make_product, monkeypatch):
+    monkeypatch.setenv('FLASK_ENV', 'development')
+    headers = login()
+    product_ids = fill_cart(client, make_product, headers, 3.0, 8.0)
+
+    response = client.post('/api/checkout/test', headers=headers)
+    assert response.status_code == 200
+
+    order_ids = response.get_json()['order_ids']
+    orders = [db.session.get(Order, order_id) for order_id in order_ids]
+    assert [(order.product_id, order.amount_paid, order.status) for order in orders] == [
+        (product_ids[0], 3.0, 'paid'), (product_ids[1], 8.0, 'paid')
+    ]
+    assert Order.query.count() == 2
+    assert client.get('/api/cart', headers=headers).get_json()['items'] == []
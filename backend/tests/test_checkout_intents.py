@@ -0,0 +1,62 @@
+"""Async checkout: orders commit with an intent, the provider call happens in the background."""
+import time
+from models import CheckoutIntent
+from services import checkout_intents
+
+
+def test_async_checkout_returns_intent_then_url(client, login, stub, add_product_to_cart):
+    headers = login()
+    add_product_to_cart(headers)
+
+    response = client.post('/api/checkout?async=1', headers=headers)
+    assert response.status_code == 202
+    intent_id = response.get_json()['intent_id']
+
+    deadline = time.monotonic() + 5
+    while True:
+        data = client.get(f'/api/checkout/intents/{intent_id}', headers=headers).get_json()
+        if data['status'] not in ('pending', 'processing') or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+
+    assert data['status'] == 'ready'
+    assert data['checkout_url'].startswith('https://stub.lemonsqueezy.test/')
+
+
+def test_failed_attempt_is_rescheduled(app, db, login, stub):
+    login()
+    stub.fail_next = 100
+    intent = checkout_intents.create_intent(1, [1], {"data": {}})
+    db.session.commit()
+
+    intent = checkout_intents.process(intent.id)
+    assert intent.status == 'pending'
+    assert intent.attempts == 1
+    assert intent.next_attempt_at is not None
+
+    intent.attempts = checkout_intents.MAX_ATTEMPTS - 1
+    db.session.commit()
+    intent = checkout_intents.process(intent.id)
+    assert intent.status == 'failed'
+    assert intent.last_error.startswith('HTTP 503')
+
+
+def test_malformed_success_fails_without_retry(app, db, login, stub):
+    login()
+    stub.checkout_body = {"data": {"type": "checkouts"}}
+    intent = checkout_intents.create_intent(1, [1], {"data": {}})
+    db.session.commit()
+
+    intent = checkout_intents.process(intent.id)
+    assert intent.status == 'failed'
+    assert intent.attempts == 1
+    assert "KeyError" in intent.last_error
+
+
+def test_intent_is_private(client, db, login):
+    login('owner')
+    intent = checkout_intents.create_intent(1, [1], {})
+    db.session.commit()
+
+    other = login('other')
+    assert client.get(f'/api/checkout/intents/{intent.id}', headers=other).status_code == 404
@@ -0,0 +1,19 @@
+"""The catalog's ETag follows the `catalog` cache tag, so every write changes it."""
+
+
+def test_catalog_etag_changes_on_delete(client, login, make_product):
+    headers = login('seller', role='seller')
+    kept, deleted = make_product(name='Kept'), make_product(name='Gone')
+
+    first = client.get('/api/products')
+    etag = first.headers['ETag']
+    assert 'Last-Modified' not in first.headers
+    assert client.get('/api/products', headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.delete(f'/api/products/{deleted.id}', headers=headers).status_code == 200
+
+    response = client.get('/api/products', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [item['id'] for item in response.get_json()['items']] == [kept.id]
+    response = client.get('/api/products', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+    assert response.status_code == 200
@@ -0,0 +1,57 @@
+"""Paid purchases grant entitlements, which every ownership check reads."""
+from models import Entitlement, User
+
+
+def test_checkout_grants_entitlement(client, db, login, make_product, monkeypatch):
+    monkeypatch.setenv('FLASK_ENV', 'development')
+    headers = login()
+    product_id = make_product().id
+
+    assert client.post('/api/cart/items', json={'product_id': product_id}, headers=headers).status_code == 201
+    assert client.post('/api/checkout/test', headers=headers).status_code == 200
+    assert db.session.query(Entitlement.product_id).all() == [(product_id,)]
+
+    response = client.post('/api/cart/items', json={'product_id': product_id}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'already_owned'
+
+
+def test_download_requires_entitlement(client, db, login, make_product):
+    headers = login()
+    product_id = make_product().id
+
+    response = client.get(f'/api/products/{product_id}/files/1/download', headers=headers)
+    assert response.status_code == 403
+
+
+def test_grant_from_another_process_is_seen_despite_cached_set(client, db, login, make_product):
+    from services import entitlements
+    headers = login()
+    user_id = User.query.filter_by(username='buyer').one().id
+    product_id = make_product().id
+    assert not entitlements.owns(user_id, product_id)
+
+    # Granted elsewhere (another worker, or `flask webhooks process`): no forget() here
+    entitlements.grant([(user_id, product_id)])
+    db.session.commit()
+
+    assert entitlements.owns(user_id, product_id)
+    response = client.get(f'/api/products/{product_id}/files/1/download', headers=headers)
+    assert response.status_code == 404  # past the ownership check; the product has no files
+
+
+def test_checkout_rejects_product_bought_in_another_process(client, db, login, make_product, stub):
+    from services import entitlements
+    headers = login()
+    user_id = User.query.filter_by(username='buyer').one().id
+    product_id = make_product().id
+    # Adding to the cart caches the (still empty) owned set
+    assert client.post('/api/cart/items', json={'product_id': product_id}, headers=headers).status_code == 201
+
+    entitlements.grant([(user_id, product_id)])
+    db.session.commit()
+
+    response = client.post('/api/checkout', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'already_owned'
+    assert stub.requests == []
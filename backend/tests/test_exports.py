@@ -0,0 +1,61 @@
+"""Seller exports stream their rows as CSV or NDJSON."""
+import csv
+import io
+import json
+from datetime import datetime
+
+
+def make_sales(make_product, make_order):
+    mine = make_product(name='=HYPERLINK("x")', price=5.0, updated_at=datetime(2026, 3, 1))
+    theirs = make_product(seller='other', name='Theirs', price=9.0, updated_at=datetime(2026, 1, 1))
+    for product, created_at, status in [
+        (mine, datetime(2026, 1, 10), 'paid'),
+        (mine, datetime(2026, 2, 10), 'paid'),
+        (mine, datetime(2026, 2, 11), 'unpaid'),
+        (theirs, datetime(2026, 2, 10), 'paid'),
+    ]:
+        make_order(product, status=status, created_at=created_at)
+    return mine.id
+
+
+def test_orders_csv(client, login, make_product, make_order):
+    headers = login('seller', role='seller')
+    make_sales(make_product, make_order)
+
+    response = client.get('/api/exports/orders', headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="orders-')
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['created_at'], row['status']) for row in rows] == [
+        ('2026-01-10T00:00:00', 'paid'), ('2026-02-10T00:00:00', 'paid')
+    ]
+    # Spreadsheet formulas are neutralised
+    assert rows[0]['product_name'] == '\'=HYPERLINK("x")'
+
+
+def test_orders_ndjson_since(client, login, make_product, make_order):
+    headers = login('seller', role='seller')
+    product_id = make_sales(make_product, make_order)
+
+    response = client.get('/api/exports/orders?format=ndjson&since=2026-02-01&status=all', headers=headers)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(line['product_id'], line['status']) for line in lines] == [(product_id, 'paid'), (product_id, 'unpaid')]
+
+
+def test_products_since(client, login, make_product, make_order):
+    headers = login('seller', role='seller')
+    product_id = make_sales(make_product, make_order)
+
+    response = client.get('/api/exports/products?format=ndjson&since=2026-02-01T00:00:00Z', headers=headers)
+    assert [json.loads(line)['id'] for line in response.get_data(as_text=True).splitlines()] == [product_id]
+
+
+def test_export_validation(client, login):
+    headers = login('seller', role='seller')
+
+    assert client.get('/api/exports/orders?format=xlsx', headers=headers).status_code == 400
+    assert client.get('/api/exports/orders?since=yesterday', headers=headers).status_code == 400
+    assert client.get('/api/exports/products', headers=login()).status_code == 403
@@ -0,0 +1,53 @@
+"""Checkout requests sent with an Idempotency-Key run once; repeats replay the stored response."""
+from models import IdempotencyKey, Order, User
+from services import idempotency
+
+
+def test_repeated_checkout_is_replayed(client, login, stub, add_product_to_cart):
+    headers = login()
+    add_product_to_cart(headers)
+    headers['Idempotency-Key'] = 'checkout-1'
+
+    first = client.post('/api/checkout', headers=headers)
+    second = client.post('/api/checkout', headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert Order.query.count() == 1
+    assert len(stub.requests) == 1
+
+
+def test_key_is_scoped_to_request(client, login, stub, add_product_to_cart):
+    headers = login()
+    add_product_to_cart(headers)
+    headers['Idempotency-Key'] = 'checkout-1'
+
+    assert client.post('/api/checkout', headers=headers).status_code == 200
+    response = client.post('/api/checkout?async=1', headers=headers)
+    assert response.status_code == 422
+    assert response.get_json()['code'] == 'idempotency_key_reused'
+
+
+def test_duplicate_while_in_progress_is_rejected(app, client, login, stub, add_product_to_cart):
+    headers = login()
+    add_product_to_cart(headers)
+    headers['Idempotency-Key'] = 'checkout-1'
+    # Claim the key the way the first request does before its view runs
+    with app.test_request_context('/api/checkout', method='POST'):
+        user_id = User.query.filter_by(username='buyer').one().id
+        assert idempotency._claim(user_id, 'checkout-1', idempotency._request_hash())
+
+    response = client.post('/api/checkout', headers=headers)
+    assert response.status_code == 409
+    assert response.get_json()['code'] == 'idempotency_key_in_progress'
+    assert Order.query.count() == 0
+    assert stub.requests == []
+
+
+def test_requests_without_key_are_unchanged(client, login, stub, add_product_to_cart):
+    headers = login()
+    add_product_to_cart(headers)
+
+    assert client.post('/api/checkout', headers=headers).status_code == 200
+    assert IdempotencyKey.query.count() == 0
@@ -0,0 +1,51 @@
+"""Check that the hot lookup paths are answered from the indexes declared on the models.
+
+Runs against TEST_DATABASE_URL (SQLite in memory by default). On PostgreSQL
+sequential scans are disabled for the EXPLAIN so the planner reports the index
+it would use on a large table instead of scanning the empty test tables.
+"""
+import pytest
+from models import Product, ProductFile, Order, CartItem
+
+
+def explain(db, query):
+    dialect = db.session.get_bind().dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'postgresql':
+        db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+        rows = db.session.execute(db.text('EXPLAIN ' + sql)).fetchall()
+    else:
+        rows = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+@pytest.mark.parametrize('name, build_query, index', [
+    ('catalog newest',
+     lambda: Product.query.filter_by(is_active=True).order_by(Product.created_at.desc(), Product.id.desc()).limit(24),
+     'ix_products_active_created_at'),
+    ('catalog price_low',
+     lambda: Product.query.filter_by(is_active=True).order_by(Product.price.asc(), Product.id.asc()).limit(24),
+     'ix_products_active_price'),
+    ('store products',
+     lambda: Product.query.filter_by(user_id=1, is_active=True).order_by(Product.created_at.desc(), Product.id.desc()).limit(24),
+     'ix_products_user_created_at'),
+    ('product files',
+     lambda: ProductFile.query.filter(ProductFile.product_id.in_([1, 2, 3])),
+     'ix_product_files_product_id'),
+    ('orders by email',
+     lambda: Order.query.filter_by(customer_email='buyer@example.com', status='paid'),
+     'ix_orders_customer_email_status'),
+    ('my orders page',
+     lambda: Order.query.filter_by(user_id=1).order_by(Order.created_at.desc(), Order.id.desc()).limit(24),
+     'ix_orders_user_created_at'),
+    ('ownership check',
+     lambda: Order.query.filter_by(user_id=1, product_id=1, status='paid'),
+     'ix_orders_user_product_status'),
+    ('cart item lookup',
+     lambda: CartItem.query.filter_by(cart_id=1, product_id=1),
+     'ix_cart_items_cart_product'),
+])
+def test_query_uses_index(db, name, build_query, index):
+    plan = explain(db, build_query())
+    assert index in plan, f"{name} does not use {index}:\n{plan}"
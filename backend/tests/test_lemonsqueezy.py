@@ -0,0 +1,90 @@
+"""The Lemon Squeezy client against the local stub server."""
+import pytest
+import requests
+from flask import Flask
+from services.lemonsqueezy import LemonSqueezyClient
+from tests.lemonsqueezy_stub import LemonSqueezyStub
+
+
+@pytest.fixture
+def stub():
+    stub = LemonSqueezyStub().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def provider(stub):
+    app = Flask(__name__)
+    app.config.update(
+        LEMONSQUEEZY_API_URL=stub.url,
+        LEMONSQUEEZY_API_KEY='test-key',
+        LEMONSQUEEZY_READ_TIMEOUT=0.5,
+        LEMONSQUEEZY_MAX_RETRIES=2,
+        LEMONSQUEEZY_RETRY_BACKOFF=0.01,
+    )
+    return LemonSqueezyClient(app)
+
+
+def test_create_checkout(provider, stub):
+    response = provider.create_checkout({"data": {"type": "checkouts"}})
+
+    assert response.status_code == 201
+    assert response.json()['data']['attributes']['url'].startswith('https://stub.lemonsqueezy.test/')
+    assert stub.requests == [('POST', '/checkouts', {"data": {"type": "checkouts"}})]
+    assert provider.metrics.snapshot()['create_checkout']['count'] == 1
+
+
+def test_caller_headers_are_not_modified(provider, stub):
+    headers = {'X-Request-Id': 'abc'}
+    provider.request('GET', '/stores', headers=headers)
+
+    assert headers == {'X-Request-Id': 'abc'}
+
+
+def test_idempotent_calls_are_retried(provider, stub):
+    stub.fail_next = 2
+
+    response = provider.request('GET', '/checkouts/abc')
+
+    assert response.status_code == 200
+    assert len(stub.requests) == 3
+    assert provider.metrics.snapshot()['GET /checkouts/abc']['retries'] == 2
+
+
+def test_checkout_creation_is_not_retried(provider, stub):
+    stub.fail_next = 1
+
+    response = provider.create_checkout({})
+
+    assert response.status_code == 503
+    assert len(stub.requests) == 1
+
+
+def test_read_timeout_is_bounded(provider, stub):
+    stub.delay = 1
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        provider.create_checkout({})
+
+    assert len(stub.requests) == 1
+    assert provider.metrics.snapshot()['create_checkout']['errors'] == 1
+
+
+def test_checkout_endpoint_uses_provider(app, client, login, stub, make_product, monkeypatch):
+    from extensions import lemonsqueezy
+
+    monkeypatch.setenv('LEMONSQUEEZY_STORE_ID', '1')
+    monkeypatch.setenv('LEMONSQUEEZY_VARIANT_ID', '2')
+    monkeypatch.setattr(lemonsqueezy, 'api_url', stub.url)
+    monkeypatch.setattr(lemonsqueezy, 'api_key', 'test-key')
+
+    headers = login()
+    product = make_product(name='Font', price=12.5)
+    client.post('/api/cart/items', json={'product_id': product.id}, headers=headers)
+
+    response = client.post('/api/checkout', headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['checkout_url'].startswith('https://stub.lemonsqueezy.test/')
+    assert stub.requests[0][2]['data']['attributes']['custom_price'] == 1250
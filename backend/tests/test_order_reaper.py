@@ -0,0 +1,45 @@
+"""Unpaid orders from abandoned checkouts are cancelled in batches once they are old enough."""
+from datetime import datetime, timedelta
+import pytest
+from models import Order
+from services.order_reaper import cancel_stale_unpaid
+
+
+@pytest.fixture
+def aged_order(make_order):
+    def aged_order(status, age_hours):
+        return make_order(status=status, created_at=datetime.utcnow() - timedelta(hours=age_hours)).id
+    return aged_order
+
+
+def statuses():
+    return {order.id: order.status for order in Order.query.all()}
+
+
+def test_only_old_unpaid_orders_are_cancelled(aged_order):
+    old = aged_order('unpaid', 48)
+    recent = aged_order('unpaid', 1)
+    paid = aged_order('paid', 48)
+
+    assert cancel_stale_unpaid(timedelta(hours=24)) == 1
+    assert statuses() == {old: 'cancelled', recent: 'unpaid', paid: 'paid'}
+
+
+def test_batches_until_done(aged_order):
+    ids = [aged_order('unpaid', 48) for _ in range(5)]
+
+    assert cancel_stale_unpaid(timedelta(hours=24), batch_size=2, max_batches=2) == 4
+    assert cancel_stale_unpaid(timedelta(hours=24), batch_size=2) == 1
+    assert set(statuses().values()) == {'cancelled'}
+    assert sorted(statuses()) == ids
+
+
+def test_cli_uses_configured_age(app, aged_order):
+    aged_order('unpaid', 30)
+    app.config['UNPAID_ORDER_MAX_AGE_HOURS'] = 36
+
+    result = app.test_cli_runner().invoke(args=['orders', 'reap'])
+    assert 'Cancelled 0 unpaid order(s)' in result.output
+
+    result = app.test_cli_runner().invoke(args=['orders', 'reap', '--older-than-hours', '24'])
+    assert 'Cancelled 1 unpaid order(s)' in result.output
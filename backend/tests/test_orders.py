@@ -0,0 +1,45 @@
+"""GET /api/my-orders pages through the caller's orders by (created_at, id)."""
+from datetime import datetime, timedelta
+from models import Order
+
+
+def make_orders(make_product, make_order, count, status='paid'):
+    product = make_product(files=['pack.zip'])
+    created_at = datetime(2026, 1, 1)
+    for i in range(count):
+        # Pairs of orders share a timestamp so the id tiebreaker matters
+        make_order(product, status=status, created_at=created_at + timedelta(minutes=i // 2))
+    return [order.id for order in Order.query.order_by(Order.created_at.desc(), Order.id.desc())]
+
+
+def test_pages_cover_every_order_once(client, login, make_product, make_order):
+    headers = login()
+    expected = make_orders(make_product, make_order, 7)
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/my-orders?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=headers).get_json()
+        assert len(page['items']) <= 3
+        assert all(item['product']['files'][0]['filename'] == 'pack.zip' for item in page['items'])
+        seen += [item['id'] for item in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+def test_only_the_callers_orders_are_listed(client, login, make_product, make_order):
+    login()
+    make_orders(make_product, make_order, 2)
+    other = login('other')
+
+    page = client.get('/api/my-orders?status=all', headers=other).get_json()
+    assert page == {'items': [], 'next_cursor': None}
+
+
+def test_invalid_cursor_is_rejected(client, login):
+    headers = login()
+
+    assert client.get('/api/my-orders?cursor=nope', headers=headers).status_code == 400
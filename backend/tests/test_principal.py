@@ -0,0 +1,23 @@
+"""Access tokens carry the caller's role, email and store, and are revoked by bumping token_version."""
+
+
+def test_claims_answer_role_checks(client, login):
+    headers = login()
+
+    response = client.get('/api/products/my', headers=headers)
+    assert response.status_code == 403
+
+
+def test_store_registration_revokes_old_token(client, login):
+    headers = login()
+
+    response = client.post('/api/stores/', json={'name': 'Shop'}, headers=headers)
+    assert response.status_code == 201
+    new_headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    response = client.get('/api/products/my', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['code'] == 'token_revoked'
+
+    response = client.get('/api/products/my', headers=new_headers)
+    assert response.status_code == 200
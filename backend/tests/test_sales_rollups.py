@@ -0,0 +1,73 @@
+"""Paid orders are rolled up per product per day, which the seller analytics endpoint reads."""
+from datetime import datetime
+from models import Order, SalesRollup
+from services import sales_rollups
+
+
+def make_paid_orders(make_product, make_order, day=datetime(2026, 3, 1, 12)):
+    """Two buyers: one buys the pack twice that day, the other once; nobody buys the brushes"""
+    pack = make_product(name='Pack', price=5.0)
+    make_product(name='Brushes', price=8.0)
+    orders = [
+        make_order(pack, buyer=buyer, status='unpaid', created_at=day)
+        for buyer in ('buyer0', 'buyer0', 'buyer1')
+    ]
+    return pack.id, [order.id for order in orders]
+
+
+def pay(db, order_ids):
+    Order.query.filter(Order.id.in_(order_ids)).update({Order.status: 'paid'}, synchronize_session=False)
+    sales_rollups.record_paid(order_ids)
+    db.session.commit()
+
+
+def rollups():
+    return [(r.day.isoformat(), r.revenue, r.units, r.buyers) for r in SalesRollup.query.order_by(SalesRollup.day)]
+
+
+def test_incremental_rollups_match_rebuild(db, make_product, make_order):
+    _, order_ids = make_paid_orders(make_product, make_order)
+
+    pay(db, order_ids[:1])
+    pay(db, order_ids[1:])
+    incremental = rollups()
+    assert incremental == [('2026-03-01', 15.0, 3, 2)]
+
+    assert sales_rollups.rebuild() == 1
+    assert rollups() == incremental
+
+
+def test_seller_analytics(client, db, login, make_product, make_order):
+    headers = login('seller', role='seller')
+    pack_id, order_ids = make_paid_orders(make_product, make_order)
+    pay(db, order_ids)
+
+    response = client.get('/api/analytics/sales?from=2026-02-01&to=2026-03-31', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['totals'] == {'revenue': 15.0, 'units': 3}
+    assert data['products'] == [{'id': pack_id, 'name': 'Pack', 'revenue': 15.0, 'units': 3, 'buyers': 2}]
+    assert data['daily'] == [{'date': '2026-03-01', 'product_id': pack_id, 'revenue': 15.0, 'units': 3, 'buyers': 2}]
+
+    response = client.get('/api/analytics/sales?from=2026-04-01&to=2026-04-30', headers=headers)
+    assert response.get_json()['daily'] == []
+
+
+def test_range_buyers_count_returning_buyers_once(client, db, login, make_product, make_order):
+    headers = login('seller', role='seller')
+    pack = make_product()
+    order_ids = [
+        make_order(pack, status='unpaid', created_at=datetime(2026, 3, day, 12)).id
+        for day in (1, 2)
+    ]
+    pay(db, order_ids)
+
+    data = client.get('/api/analytics/sales?from=2026-03-01&to=2026-03-31', headers=headers).get_json()
+    assert [(p['units'], p['buyers']) for p in data['products']] == [(2, 1)]
+    assert [(d['date'], d['buyers']) for d in data['daily']] == [('2026-03-01', 1), ('2026-03-02', 1)]
+
+
+def test_analytics_is_for_sellers(client, login):
+    headers = login()
+
+    assert client.get('/api/analytics/sales', headers=headers).status_code == 403
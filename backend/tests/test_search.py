@@ -0,0 +1,69 @@
+"""Product search: substring matching on SQLite, name hits ranked above description hits."""
+
+
+def make_products(make_product, *products):
+    return [make_product(**fields).id for fields in products]
+
+
+def search(client, query):
+    response = client.get(f'/api/products?{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_fallback_matches_name_and_description_case_insensitively(client, make_product):
+    name_hit, description_hit, _, inactive = make_products(
+        make_product,
+        {'name': 'Watercolor BRUSHES', 'price': 1.0},
+        {'name': 'Paper', 'description': 'Goes well with brushes', 'price': 1.0},
+        {'name': 'Pencils', 'description': 'Graphite', 'price': 1.0},
+        {'name': 'Old brushes', 'price': 1.0, 'is_active': False},
+    )
+
+    ids = {item['id'] for item in search(client, 'search=brushes')['items']}
+    assert ids == {name_hit, description_hit}
+    assert search(client, 'search=100%25')['items'] == []
+
+
+def test_name_hits_rank_above_description_hits(client, make_product):
+    description_hit, name_hit = make_products(
+        make_product,
+        {'name': 'Paper', 'description': 'For ink pens', 'price': 1.0},
+        {'name': 'Ink set', 'price': 1.0},
+    )
+
+    ids = [item['id'] for item in search(client, 'search=ink')['items']]
+    assert ids == [name_hit, description_hit]
+
+
+def test_relevance_pages_have_no_duplicates_or_gaps(client, make_product):
+    ids = make_products(
+        make_product,
+        *[{'name': f'Ink {i}', 'price': 1.0} for i in range(5)],
+        *[{'name': f'Paper {i}', 'description': 'ink friendly', 'price': 1.0} for i in range(4)]
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = search(client, 'search=ink&limit=2' + (f'&cursor={cursor}' if cursor else ''))
+        assert len(page['items']) <= 2
+        seen += [item['id'] for item in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 9
+    assert set(seen[:5]) == set(ids[:5])
+    assert set(seen[5:]) == set(ids[5:])
+
+
+def test_sort_applies_to_matching_products(client, make_product):
+    cheap, expensive, _ = make_products(
+        make_product,
+        {'name': 'Ink refill', 'price': 2.0},
+        {'name': 'Paper', 'description': 'ink proof', 'price': 9.0},
+        {'name': 'Pencil', 'price': 1.0},
+    )
+
+    assert [item['id'] for item in search(client, 'search=ink&sort=price_high')['items']] == [expensive, cheap]
+    assert [item['id'] for item in search(client, 'search=ink&sort=price_low')['items']] == [cheap, expensive]
@@ -0,0 +1,134 @@
+"""Uploads go straight to storage with a presigned POST; completion checks the object and records it."""
+from datetime import datetime
+import pytest
+from models import Product, ProductFile
+
+
+class FakeStorage:
+    """Stands in for StorageService: records presigned POSTs and serves HEAD from `objects`"""
+    public_bucket = 'public'
+    private_bucket = 'private'
+    MAX_PRODUCT_FILE_SIZE = 100 * 1024 * 1024
+    MAX_PRODUCT_IMAGE_SIZE = 5 * 1024 * 1024
+    IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+    def __init__(self):
+        self.objects = {}
+        self.deleted = []
+
+    def generate_presigned_post(self, object_name, bucket_name, content_type, max_size, expiration=900):
+        self.last_post = (object_name, bucket_name, content_type, max_size)
+        return {'url': f'https://storage.test/{bucket_name}', 'fields': {'key': object_name, 'Content-Type': content_type}}
+
+    def head_object(self, object_name, bucket_name):
+        return self.objects.get((bucket_name, object_name))
+
+    def delete_file(self, object_name, bucket_name):
+        self.deleted.append(object_name)
+        self.objects.pop((bucket_name, object_name), None)
+        return True
+
+    def get_public_url(self, object_name):
+        return f'https://storage.test/public/{object_name}'
+
+    def get_private_url(self, object_name):
+        return f'https://storage.test/private/{object_name}'
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    from routes import product, user
+    fake = FakeStorage()
+    monkeypatch.setattr(product, 'storage_service', fake)
+    monkeypatch.setattr(user, 'storage_service', fake)
+    return fake
+
+
+@pytest.fixture
+def seller_headers(login):
+    return login('seller', role='seller')
+
+
+@pytest.fixture
+def product_id(seller_headers, make_product):
+    return make_product().id
+
+
+def start_upload(client, headers, path, **body):
+    body = {'filename': 'pack.zip', 'content_type': 'application/zip', 'size': 2048, **body}
+    return client.post(path, json=body, headers=headers)
+
+
+def test_product_file_upload(client, db, storage, seller_headers, product_id):
+    response = start_upload(client, seller_headers, f'/api/products/{product_id}/files/upload-intent')
+    assert response.status_code == 200
+    intent = response.get_json()
+    object_name, bucket, content_type, max_size = storage.last_post
+    assert (bucket, content_type, max_size) == ('private', 'application/zip', 100 * 1024 * 1024)
+    assert intent['fields']['key'] == object_name
+
+    complete = f'/api/products/{product_id}/files/complete'
+    body = {'upload_token': intent['upload_token']}
+    assert client.post(complete, json=body, headers=seller_headers).status_code == 400  # not uploaded yet
+
+    storage.objects[('private', object_name)] = {'ContentLength': 2000, 'ContentType': 'application/zip'}
+    response = client.post(complete, json=body, headers=seller_headers)
+    assert response.status_code == 200
+    assert response.get_json()['file']['file_size'] == 2000
+    # Completing twice does not add the file twice
+    assert client.post(complete, json=body, headers=seller_headers).status_code == 200
+    assert ProductFile.query.count() == 1
+
+
+def test_mismatched_object_is_deleted(client, db, storage, seller_headers, product_id):
+    intent = start_upload(client, seller_headers, f'/api/products/{product_id}/files/upload-intent').get_json()
+    object_name = storage.last_post[0]
+    storage.objects[('private', object_name)] = {'ContentLength': 2000, 'ContentType': 'text/html'}
+
+    response = client.post(
+        f'/api/products/{product_id}/files/complete', json={'upload_token': intent['upload_token']}, headers=seller_headers
+    )
+    assert response.status_code == 400
+    assert storage.deleted == [object_name]
+    assert ProductFile.query.count() == 0
+
+
+def test_intent_validation(client, db, storage, seller_headers, product_id):
+    path = f'/api/products/{product_id}/image/upload-intent'
+    assert start_upload(client, seller_headers, path, filename='a.png', content_type='image/png').status_code == 200
+    assert start_upload(client, seller_headers, path, filename='a.exe', content_type='image/png').status_code == 400
+    assert start_upload(
+        client, seller_headers, path, filename='a.png', content_type='image/png', size=6 * 1024 * 1024
+    ).status_code == 400
+
+
+def test_older_image_upload_does_not_replace_newer(client, db, storage, seller_headers, product_id):
+    path = f'/api/products/{product_id}/image/upload-intent'
+    uploads = []
+    for minute in (1, 2):
+        intent = start_upload(client, seller_headers, path, filename='a.png', content_type='image/png').get_json()
+        object_name = storage.last_post[0]
+        storage.objects[('public', object_name)] = {
+            'ContentLength': 2000, 'ContentType': 'image/png', 'LastModified': datetime(2026, 3, 1, 12, minute)
+        }
+        uploads.append((object_name, {'upload_token': intent['upload_token']}))
+    (older, older_body), (newer, newer_body) = uploads
+
+    complete = f'/api/products/{product_id}/image/complete'
+    assert client.post(complete, json=newer_body, headers=seller_headers).status_code == 200
+    assert client.post(complete, json=older_body, headers=seller_headers).status_code == 409
+    assert db.session.get(Product, product_id).image_url == f'https://storage.test/public/{newer}'
+    assert storage.deleted == [older]
+
+
+def test_token_is_bound_to_its_product(client, db, login, storage, seller_headers, product_id):
+    intent = start_upload(client, seller_headers, f'/api/products/{product_id}/files/upload-intent').get_json()
+    storage.objects[('private', storage.last_post[0])] = {'ContentLength': 2000, 'ContentType': 'application/zip'}
+
+    # A profile picture completion cannot consume a product file token
+    response = client.post('/api/profile/picture/complete', json={'upload_token': intent['upload_token']}, headers=seller_headers)
+    assert response.status_code == 400
+    response = client.post(
+        f'/api/products/{product_id}/files/upload-intent', json={'filename': 'x.zip', 'size': 1}, headers=login()
+    )
+    assert response.status_code == 403
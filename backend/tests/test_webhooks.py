@@ -0,0 +1,89 @@
+"""Webhook events are recorded and acknowledged, then applied in batches by the worker."""
+import hashlib
+import hmac
+import json
+import pytest
+from models import Entitlement, Order, WebhookEvent
+from services import webhooks
+
+SECRET = 'webhook-secret'
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Record enqueue() calls instead of starting the background worker"""
+    monkeypatch.setenv('LEMONSQUEEZY_WEBHOOK_SECRET', SECRET)
+    calls = []
+    monkeypatch.setattr(webhooks, 'enqueue', lambda: calls.append(True))
+    return calls
+
+
+@pytest.fixture
+def unpaid_orders(make_product, make_order):
+    def unpaid_orders(count=2):
+        return [make_order(make_product(name=f'Pack {i}'), status='unpaid').id for i in range(count)]
+    return unpaid_orders
+
+
+def post_event(client, event, secret=SECRET):
+    body = json.dumps(event).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return client.post('/api/webhook', data=body, headers={
+        'Content-Type': 'application/json', 'X-Signature': signature
+    })
+
+
+def order_created(provider_id, order_ids):
+    return {
+        'meta': {'event_name': 'order_created', 'custom_data': {'order_ids': json.dumps(order_ids)}},
+        'data': {'id': provider_id, 'attributes': {}}
+    }
+
+
+def test_event_is_acknowledged_then_applied(client, db, queued, unpaid_orders):
+    order_ids = unpaid_orders()
+
+    response = post_event(client, order_created('ls-1', order_ids))
+    assert response.status_code == 200
+    assert queued == [True]
+    assert {order.status for order in Order.query.all()} == {'unpaid'}
+
+    assert webhooks.drain() == 1
+    orders = Order.query.all()
+    assert {order.status for order in orders} == {'paid'}
+    assert {order.lemon_squeezy_order_id for order in orders} == {'ls-1'}
+    assert Entitlement.query.count() == len(order_ids)
+    assert WebhookEvent.query.one().status == 'processed'
+
+
+def test_replayed_event_is_a_noop(client, db, queued, unpaid_orders):
+    order_ids = unpaid_orders()
+    event = order_created('ls-1', order_ids)
+
+    post_event(client, event)
+    webhooks.drain()
+    assert post_event(client, event).status_code == 200
+
+    assert queued == [True]
+    assert WebhookEvent.query.count() == 1
+    assert webhooks.drain() == 0
+
+
+def test_batch_applies_many_events(client, db, queued, unpaid_orders):
+    order_ids = unpaid_orders(count=3)
+    for i, order_id in enumerate(order_ids):
+        post_event(client, order_created(f'ls-{i}', [order_id]))
+    post_event(client, {'meta': {'event_name': 'subscription_created'}, 'data': {'id': 'sub-1'}})
+
+    assert webhooks.process_batch(batch_size=10) == 4
+    assert {order.id: order.lemon_squeezy_order_id for order in Order.query.all()} == {
+        order_id: f'ls-{i}' for i, order_id in enumerate(order_ids)
+    }
+    statuses = sorted(status for (status,) in db.session.query(WebhookEvent.status))
+    assert statuses == ['ignored', 'processed', 'processed', 'processed']
+
+
+def test_invalid_signature_is_rejected(client, db, queued):
+    response = post_event(client, order_created('ls-1', [1]), secret='wrong')
+    assert response.status_code == 401
+    assert WebhookEvent.query.count() == 0
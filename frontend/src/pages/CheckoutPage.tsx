@@ -1,5 +1,6 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { apiClient } from '../utils/apiUtils';
+import { orderService } from '../services/orderService';
 import { useTranslation, Trans } from 'react-i18next';
 import { useCart } from '../context/CartContext';
 import { useAuth } from '../context/AuthContext';
@@ -15,6 +16,9 @@ const CheckoutPage: React.FC = () => {
   const isDevelopment = import.meta.env.DEV;
 
   const [isProcessing, setIsProcessing] = useState(false);
+  // Repeats of the same checkout (double submit, network retry) share a key,
+  // so the server creates the orders only once
+  const idempotencyKey = useRef(crypto.randomUUID());
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -27,8 +31,13 @@ const CheckoutPage: React.FC = () => {
     setIsProcessing(true);
 
     try {
-      const response = await apiClient.post('/checkout');
-      const { checkout_url } = response.data;
+      const response = await apiClient.post('/checkout', undefined, {
+        headers: { 'Idempotency-Key': idempotencyKey.current },
+      });
+      // 202: the server creates the provider checkout in the background
+      const checkout_url = response.status === 202
+        ? await orderService.waitForCheckout(response.data.intent_id)
+        : response.data.checkout_url;
 
       if (checkout_url) {
         window.location.href = checkout_url;
@@ -37,7 +46,11 @@ const CheckoutPage: React.FC = () => {
       }
     } catch (error: any) {
       console.error('Checkout error:', error);
-      const message = error.response?.data?.message || t('checkout.errors.failed');
+      // The server answered, so its response is stored under this key; the next attempt needs a new one
+      if (error.response && error.response.status !== 409) {
+        idempotencyKey.current = crypto.randomUUID();
+      }
+      const message = error.response?.data?.message || error.message || t('checkout.errors.failed');
       toast.error(message);
       setIsProcessing(false);
     }
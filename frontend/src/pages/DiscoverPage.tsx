@@ -9,14 +9,17 @@ const DiscoverPage: React.FC = () => {
   const { t } = useTranslation();
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchQuery, setSearchQuery] = useState('');
   const [sortBy, setSortBy] = useState('newest');
 
   const fetchProducts = React.useCallback(async () => {
     setLoading(true);
     try {
-      const data = await productService.getAllProducts(searchQuery, sortBy);
-      setProducts(data);
+      const page = await productService.getAllProducts(searchQuery, sortBy);
+      setProducts(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching products:', error);
       toast.error(t('discover.errorFetching'));
@@ -25,6 +28,21 @@ const DiscoverPage: React.FC = () => {
     }
   }, [searchQuery, sortBy, t]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await productService.getAllProducts(searchQuery, sortBy, nextCursor);
+      setProducts((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error fetching products:', error);
+      toast.error(t('discover.errorFetching'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     const timer = setTimeout(() => {
       fetchProducts();
@@ -144,6 +162,17 @@ const DiscoverPage: React.FC = () => {
               ))}
             </div>
           )}
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 rounded-full border border-slate-200 dark:border-white/10 text-sm font-medium text-slate-700 dark:text-slate-200 hover:bg-slate-100 dark:hover:bg-white/10 disabled:opacity-50"
+              >
+                {t('discover.loadMore')}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
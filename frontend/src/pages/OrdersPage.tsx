@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { useTranslation } from 'react-i18next';
 import { Link } from 'react-router-dom';
 import { orderService } from '../services/orderService';
@@ -10,7 +10,11 @@ const OrdersPage: React.FC = () => {
   const { t } = useTranslation();
   const [orders, setOrders] = useState<Order[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState<string>('paid'); // 'all', 'paid', 'unpaid'
+  // One Idempotency-Key per order until the server answers, so double clicks start one checkout
+  const payKeys = useRef<Record<number, string>>({});
 
   useEffect(() => {
     fetchOrders();
@@ -19,8 +23,9 @@ const OrdersPage: React.FC = () => {
   const fetchOrders = async () => {
     try {
       setLoading(true);
-      const data = await orderService.getMyOrders(filter);
-      setOrders(data);
+      const page = await orderService.getMyOrders(filter);
+      setOrders(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error('Failed to fetch orders', error);
       toast.error(t('orders.failedToLoad'));
@@ -29,6 +34,21 @@ const OrdersPage: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await orderService.getMyOrders(filter, nextCursor);
+      setOrders((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Failed to fetch orders', error);
+      toast.error(t('orders.failedToLoad'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDownload = async (productId: number, fileId: number) => {
     try {
       const { download_url } = await productService.getProductFileDownloadUrl(productId, fileId);
@@ -50,10 +70,14 @@ const OrdersPage: React.FC = () => {
   };
 
   const handlePay = async (orderId: number) => {
+    payKeys.current[orderId] ??= crypto.randomUUID();
     try {
-      const { checkout_url } = await orderService.payOrder(orderId);
+      const { checkout_url } = await orderService.payOrder(orderId, payKeys.current[orderId]);
       window.location.href = checkout_url;
-    } catch (error) {
+    } catch (error: any) {
+      // 409: the first click is still waiting for the provider
+      if (error.response?.status === 409) return;
+      if (error.response) delete payKeys.current[orderId];
       console.error('Failed to pay order', error);
       toast.error("Failed to initiate payment");
     }
@@ -215,6 +239,17 @@ const OrdersPage: React.FC = () => {
               )}
             </div>
           ))}
+          {nextCursor && (
+            <div className="flex justify-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 rounded-lg border border-gray-200 dark:border-white/10 text-sm font-medium text-gray-700 dark:text-gray-200 hover:bg-gray-50 dark:hover:bg-zinc-800 disabled:opacity-50"
+              >
+                {t('orders.loadMore')}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
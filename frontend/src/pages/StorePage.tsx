@@ -16,6 +16,8 @@ const StorePage: React.FC = () => {
     const [store, setStore] = useState<Store | null>(null);
     const [products, setProducts] = useState<Product[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
 
     useEffect(() => {
@@ -23,12 +25,13 @@ const StorePage: React.FC = () => {
             if (!storeId) return;
 
             try {
-                const [storeData, productsData] = await Promise.all([
+                const [storeData, productsPage] = await Promise.all([
                     storeService.getStore(parseInt(storeId)),
                     storeService.getStoreProducts(parseInt(storeId)),
                 ]);
                 setStore(storeData);
-                setProducts(productsData);
+                setProducts(productsPage.items);
+                setNextCursor(productsPage.next_cursor);
             } catch (error: any) {
                 toast.error(error.response?.data?.message || t('store.failedToLoad'));
                 navigate('/');
@@ -40,6 +43,20 @@ const StorePage: React.FC = () => {
         fetchStoreData();
     }, [storeId, navigate]);
 
+    const loadMore = async () => {
+        if (!storeId || !nextCursor) return;
+        try {
+            setLoadingMore(true);
+            const page = await storeService.getStoreProducts(parseInt(storeId), nextCursor);
+            setProducts((current) => [...current, ...page.items]);
+            setNextCursor(page.next_cursor);
+        } catch (error: any) {
+            toast.error(error.response?.data?.message || t('store.failedToLoad'));
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const filteredProducts = products.filter(product =>
         product.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
         product.description?.toLowerCase().includes(searchQuery.toLowerCase())
@@ -182,6 +199,19 @@ const StorePage: React.FC = () => {
                     ))}
                 </div>
             )}
+
+            {/* More products (the search above only filters the ones loaded so far) */}
+            {nextCursor && (
+                <div className="flex justify-center mt-8">
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="px-6 py-3 rounded-lg border border-gray-200 dark:border-white/10 text-sm font-medium text-gray-700 dark:text-white/80 hover:bg-gray-50 dark:hover:bg-white/5 disabled:opacity-50"
+                    >
+                        {t('store.loadMore')}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
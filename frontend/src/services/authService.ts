@@ -1,4 +1,5 @@
 import { apiClient } from "../utils/apiUtils";
+import { uploadDirect } from "../utils/directUpload";
 import type { User } from "../types";
 
 export const authService = {
@@ -87,14 +88,7 @@ export const authService = {
   },
 
   uploadProfilePicture: async (file: File): Promise<string> => {
-    const formData = new FormData();
-    formData.append("file", file);
-
-    const response = await apiClient.post(`/profile/picture`, formData, {
-      headers: {
-        "Content-Type": "multipart/form-data",
-      },
-    });
-    return response.data.profile_picture_url;
+    const data = await uploadDirect<{ profile_picture_url: string }>(`/profile/picture`, file);
+    return data.profile_picture_url;
   },
 };
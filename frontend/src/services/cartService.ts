@@ -15,7 +15,7 @@ export interface CartItem {
 }
 
 export interface Cart {
-  cart_id: number;
+  cart_id: number | null;
   user_id: number;
   items: CartItem[];
   total_items: number;
@@ -184,7 +184,11 @@ export const cartService = {
   /**
    * Merge local cart to server
    */
-  mergeCart: async (): Promise<{ message: string; merged_count: number }> => {
+  mergeCart: async (): Promise<{
+    message: string;
+    merged_count: number;
+    skipped?: { product_id: number; reason: "invalid" | "duplicate" | "not_found" }[];
+  }> => {
     const token = localStorage.getItem("token");
     if (!token) return { message: "Not logged in", merged_count: 0 };
 
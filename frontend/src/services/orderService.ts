@@ -1,20 +1,54 @@
 import { apiClient } from "../utils/apiUtils";
-import type { Order } from "../types";
+import type { Order, Paginated } from "../types";
+
+export interface CheckoutIntent {
+  intent_id: number;
+  status: 'pending' | 'processing' | 'ready' | 'failed';
+  order_ids: number[];
+  checkout_url: string | null;
+  message?: string;
+}
 
 export const orderService = {
   /**
-   * Get all paid orders for the current user
+   * Get a page of the current user's orders (newest first); pass next_cursor
+   * back as `cursor` for the following page
    */
-  getMyOrders: async (status: string = 'paid'): Promise<Order[]> => {
-    const response = await apiClient.get(`/my-orders?status=${status}`);
+  getMyOrders: async (status: string = 'paid', cursor?: string): Promise<Paginated<Order>> => {
+    const params = new URLSearchParams({ status });
+    if (cursor) params.append('cursor', cursor);
+    const response = await apiClient.get<Paginated<Order>>(`/my-orders?${params.toString()}`);
     return response.data;
   },
 
-  payOrder: async (orderId: number): Promise<{ checkout_url: string }> => {
-    const response = await apiClient.post(`/orders/${orderId}/pay`);
+  /**
+   * Start a checkout for an unpaid order. Reuse the same idempotencyKey when
+   * retrying so the server replays the first response instead of calling the
+   * provider again.
+   */
+  payOrder: async (orderId: number, idempotencyKey?: string): Promise<{ checkout_url: string }> => {
+    const response = await apiClient.post(`/orders/${orderId}/pay`, undefined, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
+    });
     return response.data;
   },
 
+  /**
+   * Poll an async checkout until the provider checkout URL is ready
+   */
+  waitForCheckout: async (intentId: number, timeoutMs: number = 30000): Promise<string> => {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const response = await apiClient.get<CheckoutIntent>(`/checkout/intents/${intentId}`);
+      const intent = response.data;
+      if (intent.status === 'ready' && intent.checkout_url) return intent.checkout_url;
+      if (intent.status === 'failed') throw new Error(intent.message || 'Checkout failed');
+      const retryAfter = Number(response.headers['retry-after']) || 1;
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
+    throw new Error('Checkout is taking longer than expected; your orders are in My Orders');
+  },
+
   cancelOrder: async (orderId: number): Promise<void> => {
     await apiClient.post(`/orders/${orderId}/cancel`);
   },
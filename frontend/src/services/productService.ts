@@ -1,5 +1,6 @@
 import { apiClient } from "../utils/apiUtils";
-import type { Product, ProductFile } from "../types";
+import { uploadDirect } from "../utils/directUpload";
+import type { Paginated, Product, ProductFile } from "../types";
 
 export const productService = {
   /**
@@ -27,14 +28,15 @@ export const productService = {
   },
 
   /**
-   * Get all products (public) with optional filtering and sorting
+   * Get a page of products (public) with optional filtering and sorting
    */
-  getAllProducts: async (search?: string, sort?: string): Promise<Product[]> => {
+  getAllProducts: async (search?: string, sort?: string, cursor?: string): Promise<Paginated<Product>> => {
     const params = new URLSearchParams();
     if (search) params.append('search', search);
     if (sort) params.append('sort', sort);
+    if (cursor) params.append('cursor', cursor);
     
-    const response = await apiClient.get(`/products?${params.toString()}`);
+    const response = await apiClient.get<Paginated<Product>>(`/products?${params.toString()}`);
     return response.data;
   },
 
@@ -46,6 +48,14 @@ export const productService = {
     return response.data;
   },
 
+  /**
+   * Get many products by ID in one request, in the order given
+   */
+  getProductsBatch: async (productIds: number[]): Promise<Product[]> => {
+    const response = await apiClient.get(`/products/batch?ids=${productIds.join(',')}`);
+    return response.data.items;
+  },
+
   /**
    * Delete a product
    */
@@ -56,25 +66,13 @@ export const productService = {
   },
 
   /**
-   * Upload a file for a product
+   * Upload a file for a product (directly to storage)
    */
   uploadProductFile: async (
     productId: number,
     file: File
   ): Promise<{ message: string; file: ProductFile }> => {
-    const formData = new FormData();
-    formData.append("file", file);
-
-    const response = await apiClient.post(
-      `/products/${productId}/files`,
-      formData,
-      {
-        headers: {
-          "Content-Type": "multipart/form-data",
-        },
-      }
-    );
-    return response.data;
+    return uploadDirect<{ message: string; file: ProductFile }>(`/products/${productId}/files`, file);
   },
 
   /**
@@ -120,25 +118,13 @@ export const productService = {
   },
 
   /**
-   * Upload a product image
+   * Upload a product image (directly to storage)
    */
   uploadProductImage: async (
     productId: number,
     image: File
   ): Promise<{ message: string; image_url: string }> => {
-    const formData = new FormData();
-    formData.append("image", image);
-
-    const response = await apiClient.post(
-      `/products/${productId}/image`,
-      formData,
-      {
-        headers: {
-          "Content-Type": "multipart/form-data",
-        },
-      }
-    );
-    return response.data;
+    return uploadDirect<{ message: string; image_url: string }>(`/products/${productId}/image`, image);
   },
 
   /**
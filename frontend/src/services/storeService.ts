@@ -1,4 +1,5 @@
 import { apiClient } from "../utils/apiUtils";
+import type { Paginated, Product } from "../types";
 
 export interface Store {
   id: number;
@@ -9,11 +10,15 @@ export interface Store {
 }
 
 export const storeService = {
-  registerStore: async (name: string, description: string): Promise<{ message: string; store: Store; user_role: string }> => {
+  registerStore: async (name: string, description: string): Promise<{ message: string; store: Store; user_role: string; access_token: string }> => {
     const response = await apiClient.post(
       `/stores/`,
       { name, description }
     );
+    // Registering revokes the old token (it carries the buyer role); switch to the new one
+    if (response.data.access_token) {
+      localStorage.setItem("token", response.data.access_token);
+    }
     return response.data;
   },
 
@@ -27,8 +32,11 @@ export const storeService = {
     return response.data;
   },
 
-  getStoreProducts: async (storeId: number): Promise<any[]> => {
-    const response = await apiClient.get(`/stores/${storeId}/products`);
+  getStoreProducts: async (storeId: number, cursor?: string): Promise<Paginated<Product>> => {
+    const params = new URLSearchParams();
+    if (cursor) params.append('cursor', cursor);
+
+    const response = await apiClient.get<Paginated<Product>>(`/stores/${storeId}/products?${params.toString()}`);
     return response.data;
   },
 
@@ -28,6 +28,12 @@ export interface Product {
   store_id?: number;
   files: ProductFile[];
   files_count?: number; // For public store view
+  files_size?: number; // Total bytes of all files, public store view
+}
+
+export interface Paginated<T> {
+  items: T[];
+  next_cursor: string | null;
 }
 
 export interface Order {
@@ -0,0 +1,34 @@
+import axios from "axios";
+import { apiClient } from "./apiUtils";
+
+interface UploadIntent {
+  upload_url: string;
+  fields: Record<string, string>;
+  upload_token: string;
+  expires_in: number;
+}
+
+/**
+ * Upload a file straight to storage: ask the API for a presigned POST at
+ * `${basePath}/upload-intent`, send the file to storage, then confirm it at
+ * `${basePath}/complete` and return that response.
+ */
+export const uploadDirect = async <T>(basePath: string, file: File): Promise<T> => {
+  const { data: intent } = await apiClient.post<UploadIntent>(`${basePath}/upload-intent`, {
+    filename: file.name,
+    content_type: file.type || "application/octet-stream",
+    size: file.size,
+  });
+
+  const formData = new FormData();
+  Object.entries(intent.fields).forEach(([name, value]) => formData.append(name, value));
+  // Storage ignores form fields that come after the file
+  formData.append("file", file);
+  // Plain axios: storage must not receive our API Authorization header
+  await axios.post(intent.upload_url, formData);
+
+  const { data } = await apiClient.post<T>(`${basePath}/complete`, {
+    upload_token: intent.upload_token,
+  });
+  return data;
+};